@@ -29,13 +29,39 @@ class Settings(BaseSettings):
     DATABASE_NAME: str | None = None
     DATABASE_USER: str | None = None
     DATABASE_PASSWORD: str | None = None
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: int = 30
+    DB_POOL_RECYCLE: int = 1800  # segundos; -1 desactiva el reciclaje
+    DB_STATEMENT_TIMEOUT_MS: int = 0  # 0 = sin límite
+    DB_SLOW_QUERY_MS: int = 500
     JWT_SECRET: str = "dev"
     JWT_AUDIENCE: str = "app"
     JWT_ISSUER: str = "uisgo-api"
     JWT_EXPIRES_MIN: int = 60
+    AUTH_TOKEN_CACHE_SIZE: int = 4096  # 0 desactiva la caché de tokens verificados
     PASSWORD_RESET_TOKEN_MINUTES: int = 30
+    PASSWORD_HASH_WORKERS: int = 4
+    PASSWORD_HASH_QUEUE_DEPTH: int = 16
     BACKEND_CORS_ORIGINS: str | None = None
     OPENAI_API_KEY: str = ""
+    CHAT_LLM_BACKEND: str = "openai"  # "openai" o "fake" para pruebas locales
+    FAKE_LLM_FIRST_TOKEN_MS: int = 300
+    FAKE_LLM_TOKEN_DELAY_MS: int = 20
+    CHAT_CONTEXT_TURNS: int = 6
+    CHAT_CONTEXT_MAX_TOKENS: int = 3000
+    CHAT_SUMMARY_BATCH: int = 8
+    CHAT_CACHE_ENABLED: bool = False
+    CHAT_CACHE_BACKEND: str = "memory"  # "memory" o "paquete.modulo:Clase"
+    CHAT_CACHE_TTL_SECONDS: int = 6 * 60 * 60
+    CHAT_CACHE_MAX_ENTRIES: int = 1000
+    GRADING_SPEC_CACHE_SIZE: int = 2048
+    GRADING_SPEC_CACHE_TTL_SECONDS: int = 600
+    NEWS_FEED_CACHE_SIZE: int = 256
+    NEWS_FEED_CACHE_TTL_SECONDS: int = 60
+    NEWS_SCHEDULER_ENABLED: bool = False  # un solo proceso por despliegue, o el CLI
+    NEWS_SCHEDULER_INTERVAL_SECONDS: int = 60
+    METRICS_TOKEN: str = ""  # bearer fijo para el scraper; vacío = solo superusuario
     ADMIN_WEB_BASE_URL: str = "http://localhost:5173"
     DEEP_LINK_PREFIX: str = "uisgo://join?code="
 
@@ -1,11 +1,16 @@
+import hashlib
+import hmac
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from jose import jwt, JWTError
 from sqlalchemy.orm import Session
+from app.core.cache import LRUCache
 from app.core.config import settings
-from app.db.session import SessionLocal
+from app.db.session import AsyncSessionLocal, SessionLocal
 
 bearer = HTTPBearer(auto_error=False)
+# Claims ya verificados, indexados por el hash del token y vigentes hasta su propio exp.
+token_cache = LRUCache(settings.AUTH_TOKEN_CACHE_SIZE)
 
 def get_db():
     db = SessionLocal()
@@ -14,15 +19,25 @@ def get_db():
     finally:
         db.close()
 
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
 def current_user(creds: HTTPAuthorizationCredentials = Depends(bearer)):
     if not creds:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="missing token")
     token = creds.credentials
+    digest = hashlib.sha256(token.encode("utf-8")).digest()
+    cached = token_cache.get(digest)
+    if cached is not None:
+        return dict(cached)
     try:
         payload = jwt.decode(token, settings.JWT_SECRET, ["HS256"], audience=settings.JWT_AUDIENCE, issuer=settings.JWT_ISSUER)
-        return payload  # {"sub":..., "role":...}
     except JWTError:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="invalid token")
+    if isinstance(payload.get("exp"), (int, float)):
+        token_cache.set(digest, dict(payload), expires_at=payload["exp"])
+    return payload  # {"sub":..., "role":...}
 
 def require_role(*roles):
     def inner(user=Depends(current_user)):
@@ -31,6 +46,13 @@ def require_role(*roles):
         return user
     return inner
 
+def require_metrics_access(creds: HTTPAuthorizationCredentials = Depends(bearer)):
+    # El scraper usa METRICS_TOKEN (los JWT caducan); si no hay token configurado, solo superusuario.
+    if settings.METRICS_TOKEN and creds and hmac.compare_digest(creds.credentials, settings.METRICS_TOKEN):
+        return
+    if current_user(creds).get("role") != "superuser":
+        raise HTTPException(status_code=403, detail="forbidden")
+
 require_student   = require_role("student")
 require_professor = require_role("professor")
 require_superuser = require_role("superuser")
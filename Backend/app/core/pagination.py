@@ -0,0 +1,138 @@
+"""Keyset (cursor) pagination helpers.
+
+A ``Keyset`` describes the ORDER BY of a listing as a sequence of
+``SortKey``s ending in a unique column (the id). Cursors are opaque
+url-safe base64 JSON arrays holding the sort values of the last row served;
+the next page filters on "strictly after" those values, which lets the
+composite indexes seek instead of scanning past an OFFSET.
+"""
+from __future__ import annotations
+
+import base64
+import json
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Callable, Optional, Sequence
+from uuid import UUID
+
+from fastapi import HTTPException, Response, status
+from sqlalchemy import and_, false, or_, tuple_
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+@dataclass(frozen=True)
+class SortKey:
+    column: Any
+    descending: bool = False
+    nullable: bool = False  # NULLs siempre al final
+
+    @property
+    def name(self) -> str:
+        return self.column.key
+
+    def order_by(self):
+        clause = self.column.desc() if self.descending else self.column.asc()
+        return clause.nullslast() if self.nullable else clause
+
+    def after(self, value):
+        if value is None:
+            return false()
+        clause = self.column < value if self.descending else self.column > value
+        return or_(clause, self.column.is_(None)) if self.nullable else clause
+
+    def equal(self, value):
+        return self.column.is_(None) if value is None else self.column == value
+
+    def decode(self, raw):
+        if raw is None:
+            return None
+        python_type = self.column.type.python_type
+        try:
+            if python_type is datetime:
+                return datetime.fromisoformat(raw)
+            if python_type is UUID:
+                return UUID(raw)
+            return python_type(raw)
+        except (TypeError, ValueError) as exc:
+            raise ValueError(str(exc)) from exc
+
+
+def _encode_value(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, UUID):
+        return str(value)
+    return value
+
+
+class Keyset:
+    def __init__(self, *keys: SortKey):
+        self.keys = keys
+
+    def order_by(self) -> list:
+        return [key.order_by() for key in self.keys]
+
+    def encode(self, row) -> str:
+        payload = json.dumps([_encode_value(getattr(row, key.name)) for key in self.keys], separators=(",", ":"))
+        return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+    def decode(self, cursor: str) -> list:
+        try:
+            padded = cursor + "=" * (-len(cursor) % 4)
+            raw = json.loads(base64.urlsafe_b64decode(padded.encode()))
+            if not isinstance(raw, list) or len(raw) != len(self.keys):
+                raise ValueError("cursor shape")
+            return [key.decode(value) for key, value in zip(self.keys, raw)]
+        except ValueError:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="invalid cursor")
+
+    def after(self, values: Sequence):
+        # Con una sola dirección y sin NULLs se usa la comparación de filas,
+        # que Postgres resuelve con un único rango sobre el índice compuesto.
+        directions = {key.descending for key in self.keys}
+        if len(directions) == 1 and not any(key.nullable for key in self.keys):
+            row = tuple_(*(key.column for key in self.keys))
+            return row < tuple_(*values) if directions.pop() else row > tuple_(*values)
+        clauses = []
+        for index, key in enumerate(self.keys):
+            prefix = [prev.equal(value) for prev, value in zip(self.keys[:index], values)]
+            clauses.append(and_(*prefix, key.after(values[index])))
+        return or_(*clauses)
+
+    def apply(self, query, cursor: Optional[str], limit: int, offset: int = 0):
+        """Orders, filters and limits ``query`` (ORM Query or select); fetches one extra row."""
+        if cursor and offset:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="use either cursor or offset")
+        query = query.order_by(*self.order_by())
+        if cursor:
+            query = query.where(self.after(self.decode(cursor)))
+        elif offset:
+            query = query.offset(offset)
+        return query.limit(limit + 1)
+
+    def split(
+        self,
+        rows: Sequence,
+        limit: int,
+        key_of: Callable[[Any], Any] = lambda row: row,
+    ) -> tuple[list, Optional[str]]:
+        """Trims the extra row and returns the cursor of the next page, if any."""
+        rows = list(rows)
+        if len(rows) <= limit:
+            return rows, None
+        rows = rows[:limit]
+        return rows, self.encode(key_of(rows[-1]))
+
+    def page(
+        self,
+        rows: Sequence,
+        limit: int,
+        response: Response,
+        key_of: Callable[[Any], Any] = lambda row: row,
+    ) -> list:
+        """Like ``split`` but sets the next cursor header on ``response``."""
+        rows, next_cursor = self.split(rows, limit, key_of)
+        if next_cursor:
+            response.headers[NEXT_CURSOR_HEADER] = next_cursor
+        return rows
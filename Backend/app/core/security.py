@@ -1,16 +1,88 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Any, Dict
+from typing import Any, Callable, Dict
 from jose import jwt
 from passlib.context import CryptContext
 from app.core.config import settings
 
 pwd_ctx = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+
+class PasswordHasherBusy(RuntimeError):
+    """Raised when the bcrypt pool and its queue are full; the API answers 503."""
+
+
+class PasswordHasherPool:
+    def __init__(self, workers: int, queue_depth: int):
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="bcrypt")
+        self._slots = threading.BoundedSemaphore(workers + queue_depth)
+        self._lock = threading.Lock()
+        self.workers = workers
+        self.queue_depth = queue_depth
+        self.in_flight = 0
+        self.completed = 0
+        self.rejected = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+        self.hash_seconds_total = 0.0
+        self.hash_seconds_max = 0.0
+
+    def run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self.rejected += 1
+            raise PasswordHasherBusy("password hasher queue is full")
+        submitted = time.perf_counter()
+
+        def task() -> Any:
+            started = time.perf_counter()
+            try:
+                return fn(*args)
+            finally:
+                self._record(started - submitted, time.perf_counter() - started)
+
+        with self._lock:
+            self.in_flight += 1
+        try:
+            return self._executor.submit(task).result()
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+            self._slots.release()
+
+    def _record(self, waited: float, hashed: float) -> None:
+        with self._lock:
+            self.completed += 1
+            self.wait_seconds_total += waited
+            self.wait_seconds_max = max(self.wait_seconds_max, waited)
+            self.hash_seconds_total += hashed
+            self.hash_seconds_max = max(self.hash_seconds_max, hashed)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "queue_depth": self.queue_depth,
+                "in_flight": self.in_flight,
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "wait_seconds_total": round(self.wait_seconds_total, 6),
+                "wait_seconds_max": round(self.wait_seconds_max, 6),
+                "hash_seconds_total": round(self.hash_seconds_total, 6),
+                "hash_seconds_max": round(self.hash_seconds_max, 6),
+            }
+
+
+password_hasher = PasswordHasherPool(settings.PASSWORD_HASH_WORKERS, settings.PASSWORD_HASH_QUEUE_DEPTH)
+
+
 def hash_password(pw: str) -> str:
-    return pwd_ctx.hash(pw)
+    return password_hasher.run(pwd_ctx.hash, pw)
 
 def verify_password(pw: str, pw_hash: str) -> bool:
-    return pwd_ctx.verify(pw, pw_hash)
+    return password_hasher.run(pwd_ctx.verify, pw, pw_hash)
 
 def create_access_token(sub: str, role: str, expires_minutes: int | None = None) -> str:
     exp_min = expires_minutes or settings.JWT_EXPIRES_MIN
@@ -0,0 +1,119 @@
+"""Per-request database accounting.
+
+Engine events count statements and time spent in the database; the pool
+classes below time connection checkouts. Figures accumulate on the
+``QueryStats`` of the current request (a context variable set by the HTTP
+middleware) and on per-route totals served from ``/metrics/db``.
+"""
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from contextvars import ContextVar, Token
+from dataclasses import dataclass
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+from app.core.config import settings
+
+logger = logging.getLogger("app.db")
+
+
+@dataclass
+class QueryStats:
+    queries: int = 0
+    db_seconds: float = 0.0
+    pool_wait_seconds: float = 0.0
+
+
+_current: ContextVar[QueryStats | None] = ContextVar("db_query_stats", default=None)
+
+
+def begin_request() -> tuple[QueryStats, Token]:
+    stats = QueryStats()
+    return stats, _current.set(stats)
+
+
+def end_request(token: Token) -> None:
+    _current.reset(token)
+
+
+class _TimedCheckout:
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            stats = _current.get()
+            if stats is not None:
+                stats.pool_wait_seconds += time.perf_counter() - started
+
+
+class TimedQueuePool(_TimedCheckout, QueuePool):
+    pass
+
+
+class TimedAsyncQueuePool(_TimedCheckout, AsyncAdaptedQueuePool):
+    pass
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_started"].pop()
+    stats = _current.get()
+    if stats is not None:
+        stats.queries += 1
+        stats.db_seconds += elapsed
+    if settings.DB_SLOW_QUERY_MS and elapsed * 1000 >= settings.DB_SLOW_QUERY_MS:
+        logger.warning("slow query (%.1f ms): %s", elapsed * 1000, " ".join(statement.split())[:500])
+
+
+def _handle_error(context):
+    # Una sentencia que falla no pasa por after_cursor_execute: sacar su marca
+    # aquí para que la pila de la conexión no crezca mientras viva en el pool.
+    conn = context.connection
+    started = conn.info.get("query_started") if conn is not None else None
+    if not started:
+        return
+    elapsed = time.perf_counter() - started.pop()
+    stats = _current.get()
+    if stats is not None:
+        stats.queries += 1
+        stats.db_seconds += elapsed
+
+
+def instrument(engine: Engine) -> None:
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _handle_error)
+
+
+class RouteDbMetrics:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._routes: dict[str, dict[str, float]] = {}
+
+    def record(self, route: str, stats: QueryStats) -> None:
+        with self._lock:
+            entry = self._routes.setdefault(
+                route,
+                {"requests": 0, "queries": 0, "max_queries": 0, "db_seconds": 0.0, "pool_wait_seconds": 0.0},
+            )
+            entry["requests"] += 1
+            entry["queries"] += stats.queries
+            entry["max_queries"] = max(entry["max_queries"], stats.queries)
+            entry["db_seconds"] += stats.db_seconds
+            entry["pool_wait_seconds"] += stats.pool_wait_seconds
+
+    def snapshot(self) -> dict[str, dict[str, float]]:
+        with self._lock:
+            return {route: dict(values) for route, values in self._routes.items()}
+
+
+route_db_metrics = RouteDbMetrics()
@@ -1,6 +1,85 @@
+import ssl
+
 from sqlalchemy import create_engine
+from sqlalchemy.engine import URL, make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
 from app.core.config import settings
+from app.db.instrumentation import TimedAsyncQueuePool, TimedQueuePool, instrument
+
+
+# Parámetros de libpq que asyncpg no entiende y rechazaría al conectar.
+_LIBPQ_ONLY_PARAMS = (
+    "sslcert",
+    "sslkey",
+    "sslcrl",
+    "sslpassword",
+    "sslcompression",
+    "gssencmode",
+    "channel_binding",
+    "keepalives",
+    "keepalives_idle",
+    "keepalives_interval",
+    "keepalives_count",
+    "options",
+)
+
+
+def _async_url(url: str) -> tuple[URL, dict]:
+    """Rewrites a libpq URL for asyncpg; returns the URL and the extra connect args."""
+    parsed = make_url(url)
+    if not parsed.drivername.startswith("postgres"):
+        return parsed, {}
+    query = dict(parsed.query)
+    connect_args: dict = {}
+    sslmode = query.pop("sslmode", None)
+    rootcert = query.pop("sslrootcert", None)
+    if rootcert and sslmode in ("verify-ca", "verify-full"):
+        context = ssl.create_default_context(cafile=rootcert)
+        context.check_hostname = sslmode == "verify-full"
+        connect_args["ssl"] = context
+    elif sslmode:
+        # asyncpg acepta los mismos nombres de modo que libpq (disable, require, verify-full...).
+        connect_args["ssl"] = sslmode
+    connect_timeout = query.pop("connect_timeout", None)
+    if connect_timeout:
+        connect_args["timeout"] = float(connect_timeout)
+    application_name = query.pop("application_name", None)
+    if application_name:
+        connect_args["server_settings"] = {"application_name": application_name}
+    for name in _LIBPQ_ONLY_PARAMS:
+        query.pop(name, None)
+    return parsed.set(drivername="postgresql+asyncpg", query=query), connect_args
 
-engine = create_engine(settings.DATABASE_URL, pool_pre_ping=True)
+
+_pool_options = dict(
+    pool_pre_ping=True,
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_timeout=settings.DB_POOL_TIMEOUT,
+    pool_recycle=settings.DB_POOL_RECYCLE,
+)
+_async_database_url, _async_connect_args = _async_url(settings.DATABASE_URL)
+_sync_connect_args = {}
+if settings.DB_STATEMENT_TIMEOUT_MS:
+    _sync_connect_args["options"] = f"-c statement_timeout={settings.DB_STATEMENT_TIMEOUT_MS}"
+    _async_connect_args.setdefault("server_settings", {})["statement_timeout"] = str(settings.DB_STATEMENT_TIMEOUT_MS)
+
+engine = create_engine(
+    settings.DATABASE_URL,
+    poolclass=TimedQueuePool,
+    connect_args=_sync_connect_args,
+    **_pool_options,
+)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+async_engine = create_async_engine(
+    _async_database_url,
+    poolclass=TimedAsyncQueuePool,
+    connect_args=_async_connect_args,
+    **_pool_options,
+)
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+instrument(engine)
+instrument(async_engine.sync_engine)
@@ -1,7 +1,17 @@
-from fastapi import FastAPI
+import asyncio
+import time
+
+from fastapi import Depends, FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse
 
+from app.core import metrics
 from app.core.config import settings
+from app.core.deps import require_metrics_access
+from app.core.security import PasswordHasherBusy, password_hasher
+from app.db.instrumentation import begin_request, end_request, route_db_metrics
+from app.db.session import async_engine, engine
+from app.services.news_service import run_scheduler
 from .routers import activities as activities_router
 from .routers import analytics as analytics_router
 from .routers import auth as auth_router
@@ -13,6 +23,7 @@ from .routers import join as join_router
 from .routers import news as news_router
 from .routers import places as places_router
 from .routers import questions as questions_router
+from .routers import search as search_router
 from .routers import users as users_router
 from .routers import wellness as wellness_router
 
@@ -32,8 +43,113 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag"],
 )
 
+
+@app.middleware("http")
+async def db_instrumentation(request: Request, call_next):
+    stats, token = begin_request()
+    try:
+        response = await call_next(request)
+    finally:
+        end_request(token)
+    route = request.scope.get("route")
+    route_db_metrics.record(getattr(route, "path", "unmatched"), stats)
+    response.headers["X-DB-Queries"] = str(stats.queries)
+    response.headers["X-DB-Time-Ms"] = f"{stats.db_seconds * 1000:.1f}"
+    response.headers["X-DB-Pool-Wait-Ms"] = f"{stats.pool_wait_seconds * 1000:.1f}"
+    return response
+
+
+def _route_template(request: Request) -> str:
+    # Plantilla de la ruta (/groups/{group_id}) que dejó el router en el scope,
+    # igual que en db_instrumentation; no abre una serie por UUID.
+    return getattr(request.scope.get("route"), "path", "unmatched")
+
+
+@app.middleware("http")
+async def http_metrics(request: Request, call_next):
+    # La ruta solo se conoce tras el enrutado: las peticiones en curso van por método.
+    metrics.http_requests_in_flight.inc((request.method,))
+    started = time.perf_counter()
+    status = 500
+    response = None
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        labels = (request.method, _route_template(request))
+        length = response.headers.get("content-length") if response is not None else None
+        if length is not None:
+            metrics.http_response_size_bytes.observe(labels, int(length))
+        metrics.http_request_duration_seconds.observe(labels, time.perf_counter() - started)
+        metrics.http_requests_total.inc(labels + (str(status),))
+        metrics.http_requests_in_flight.dec((request.method,))
+
+
+@metrics.registry.collector
+def _db_route_metrics():
+    fields = (
+        ("queries", "uisgo_db_queries_total", "counter", "SQL statements executed per route."),
+        ("db_seconds", "uisgo_db_seconds_total", "counter", "Time spent executing SQL per route."),
+        ("pool_wait_seconds", "uisgo_db_pool_wait_seconds_total", "counter", "Time spent waiting for a pooled connection per route."),
+        ("max_queries", "uisgo_db_queries_max", "gauge", "Most SQL statements seen in a single request per route."),
+    )
+    snapshot = route_db_metrics.snapshot()
+    for key, name, kind, doc in fields:
+        yield f"# HELP {name} {doc}"
+        yield f"# TYPE {name} {kind}"
+        for route, values in snapshot.items():
+            yield f"{name}{metrics.format_labels(('route',), (route,))} {values[key]}"
+    pools = (("sync", engine.pool), ("async", async_engine.pool))
+    for attr, doc in (
+        ("checkedout", "Connections currently checked out of the pool."),
+        ("checkedin", "Idle connections held by the pool."),
+        ("overflow", "Connections opened beyond pool_size."),
+    ):
+        name = f"uisgo_db_pool_{attr}"
+        yield f"# HELP {name} {doc}"
+        yield f"# TYPE {name} gauge"
+        for pool_name, pool in pools:
+            fn = getattr(pool, attr, None)
+            if fn is not None:
+                yield f"{name}{metrics.format_labels(('pool',), (pool_name,))} {fn()}"
+
+
+@metrics.registry.collector
+def _password_hasher_metrics():
+    stats = password_hasher.stats()
+    for key, name, kind in (
+        ("in_flight", "uisgo_password_hash_in_flight", "gauge"),
+        ("completed", "uisgo_password_hash_completed_total", "counter"),
+        ("rejected", "uisgo_password_hash_rejected_total", "counter"),
+        ("wait_seconds_total", "uisgo_password_hash_wait_seconds_total", "counter"),
+        ("hash_seconds_total", "uisgo_password_hash_seconds_total", "counter"),
+    ):
+        yield f"# TYPE {name} {kind}"
+        yield f"{name} {stats[key]}"
+
+
+@app.on_event("startup")
+async def start_news_scheduler():
+    if settings.NEWS_SCHEDULER_ENABLED:
+        app.state.news_scheduler = asyncio.create_task(run_scheduler(settings.NEWS_SCHEDULER_INTERVAL_SECONDS))
+
+
+@app.on_event("shutdown")
+async def stop_news_scheduler():
+    task = getattr(app.state, "news_scheduler", None)
+    if task is not None:
+        task.cancel()
+
+
+@app.exception_handler(PasswordHasherBusy)
+async def password_hasher_busy(request: Request, exc: PasswordHasherBusy):
+    return JSONResponse(status_code=503, content={"detail": "password service busy"}, headers={"Retry-After": "1"})
+
+
 app.include_router(auth_router.router, prefix="/auth", tags=["auth"])
 app.include_router(groups_router.router, prefix="/groups", tags=["groups"])
 app.include_router(activities_router.router, prefix="/activities", tags=["activities"])
@@ -43,6 +159,7 @@ app.include_router(questions_router.router, prefix="/questions", tags=["question
 app.include_router(news_router.router, prefix="/news", tags=["news"])
 app.include_router(wellness_router.router, prefix="/wellness", tags=["wellness"])
 app.include_router(places_router.router, prefix="/places", tags=["places"])
+app.include_router(search_router.router, prefix="/search", tags=["search"])
 app.include_router(chat_router.router, prefix="/chat", tags=["chat"])
 app.include_router(config_router.router, prefix="/config", tags=["config"])
 app.include_router(join_router.router, tags=["join"])
@@ -57,3 +174,16 @@ def root():
 @app.get("/health", tags=["health"])
 def health():
     return {"status": "ok"}
+
+
+@app.get("/metrics", tags=["health"], response_class=PlainTextResponse, dependencies=[Depends(require_metrics_access)])
+def prometheus_metrics():
+    return PlainTextResponse(metrics.registry.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+@app.get("/metrics/db", tags=["health"], dependencies=[Depends(require_metrics_access)])
+def db_metrics():
+    return {
+        "pool": {"sync": engine.pool.status(), "async": async_engine.pool.status()},
+        "routes": route_db_metrics.snapshot(),
+    }
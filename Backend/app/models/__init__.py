@@ -1,9 +1,9 @@
 from .user import User
 from .group import Group, GroupMembership
 from .invite import InviteCode
-from .activity import Activity, ActivityTarget
+from .activity import Activity, ActivityTarget, ActivityVisibility
 from .submission import Submission
-from .coins import CoinsLedger
+from .coins import CoinsLedger, CoinsBalance
 from .password_reset import PasswordResetToken
 from .question import Question, QuestionResponse, QuestionCredit
 from .news import NewsArticle
@@ -11,3 +11,5 @@ from .wellness import WellnessPrompt, UserMood, WellnessCenter, WellnessTurn
 from .places import Place, PlaceProduct, MapEvent
 from .chats import ChatSession, ChatMessage
 from .quick_actions import QuickAction, FeatureFlag
+from .analytics import GroupActivityStats
+from .cache_version import CacheVersion
@@ -1,6 +1,6 @@
 import uuid, enum
 from datetime import datetime
-from sqlalchemy import Column, String, Integer, DateTime, ForeignKey, Enum, UniqueConstraint
+from sqlalchemy import Column, String, Integer, DateTime, ForeignKey, Enum, Index, UniqueConstraint
 from sqlalchemy.dialects.postgresql import UUID, JSONB
 from ..db.base_class import Base
 
@@ -32,6 +32,7 @@ class Activity(Base):
     start_at = Column(DateTime(timezone=True), nullable=True)
     end_at = Column(DateTime(timezone=True), nullable=True)
     status = Column(Enum(ActivityStatus), default=ActivityStatus.draft)
+    version = Column(Integer, nullable=False, default=1, server_default="1")  # sube al publicar
     created_by = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow)
 
@@ -41,3 +42,14 @@ class ActivityTarget(Base):
     activity_id = Column(UUID(as_uuid=True), ForeignKey("activities.id"), nullable=False)
     group_id = Column(UUID(as_uuid=True), ForeignKey("groups.id"), nullable=False)
     __table_args__ = (UniqueConstraint("activity_id", "group_id", name="uq_activity_group"),)
+
+
+class ActivityVisibility(Base):
+    """Fan-out de actividades publicadas por estudiante (ver visibility_service)."""
+    __tablename__ = "activity_visibility"
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    activity_id = Column(UUID(as_uuid=True), ForeignKey("activities.id", ondelete="CASCADE"), primary_key=True)
+    start_at = Column(DateTime(timezone=True), nullable=True)
+    end_at = Column(DateTime(timezone=True), nullable=True)
+    created_at = Column(DateTime)
+    __table_args__ = (Index("ix_activity_visibility_user_window", "user_id", "start_at", "end_at"),)
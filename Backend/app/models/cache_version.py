@@ -0,0 +1,15 @@
+from datetime import datetime
+
+from sqlalchemy import BigInteger, Column, DateTime, String
+
+from ..db.base_class import Base
+
+
+class CacheVersion(Base):
+    """Shared version counters that let every worker notice another worker's writes."""
+
+    __tablename__ = "cache_versions"
+
+    name = Column(String(64), primary_key=True)
+    version = Column(BigInteger, nullable=False, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -1,7 +1,7 @@
 import uuid
 from datetime import datetime
 
-from sqlalchemy import Column, DateTime, ForeignKey, Integer, String, Text
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Integer, String, Text
 from sqlalchemy.dialects.postgresql import JSONB, UUID
 
 from ..db.base_class import Base
@@ -15,6 +15,8 @@ class ChatSession(Base):
     title = Column(String(255), nullable=False)
     policy_version = Column(String(32), nullable=False)
     coins_spent = Column(Integer, default=0)
+    summary = Column(Text)
+    summarized_until = Column(DateTime)
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
@@ -29,3 +31,5 @@ class ChatMessage(Base):
     attachments = Column(JSONB)
     coins_delta = Column(Integer, default=0)
     created_at = Column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (Index("ix_chat_messages_session_created", "session_id", "created_at"),)
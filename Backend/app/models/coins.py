@@ -1,6 +1,6 @@
 import uuid
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Index
 from sqlalchemy.dialects.postgresql import UUID
 from ..db.base_class import Base
 
@@ -13,3 +13,12 @@ class CoinsLedger(Base):
     delta = Column(Integer, nullable=False)
     reason = Column(String, nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (Index("ix_coins_ledger_user_created_id", "user_id", "created_at", "id"),)
+
+
+class CoinsBalance(Base):
+    __tablename__ = "coins_balances"
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), primary_key=True)
+    balance = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
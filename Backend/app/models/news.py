@@ -1,8 +1,9 @@
 import uuid
 from datetime import datetime
 
-from sqlalchemy import Boolean, Column, DateTime, String, Text
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import Boolean, Column, Computed, DateTime, Index, String, Text
+from sqlalchemy.dialects.postgresql import TSVECTOR, UUID
+from sqlalchemy.orm import deferred
 
 from ..db.base_class import Base
 
@@ -24,3 +25,30 @@ class NewsArticle(Base):
     publish_at = Column(DateTime, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    search_vector = deferred(
+        Column(
+            TSVECTOR,
+            Computed(
+                "setweight(to_tsvector('spanish', coalesce(title, '')), 'A') || "
+                "setweight(to_tsvector('spanish', coalesce(subtitle, '')), 'B') || "
+                "setweight(to_tsvector('spanish', coalesce(body, '')), 'C')",
+                persisted=True,
+            ),
+        )
+    )
+
+    __table_args__ = (Index("ix_news_articles_search", "search_vector", postgresql_using="gin"),)
+
+
+Index(
+    "ix_news_articles_published_feed",
+    NewsArticle.publish_at.desc().nulls_last(),
+    NewsArticle.created_at.desc(),
+    NewsArticle.id.desc(),
+    postgresql_where=NewsArticle.published.is_(True),
+)
+Index(
+    "ix_news_articles_scheduled",
+    NewsArticle.publish_at,
+    postgresql_where=NewsArticle.published.isnot(True) & NewsArticle.publish_at.isnot(None),
+)
@@ -1,8 +1,9 @@
 import uuid
 from datetime import datetime
 
-from sqlalchemy import Boolean, Column, DateTime, ForeignKey, Numeric, String, Text
-from sqlalchemy.dialects.postgresql import JSONB, UUID
+from sqlalchemy import Boolean, Column, Computed, DateTime, Float, ForeignKey, Index, Numeric, String, Text, func
+from sqlalchemy.dialects.postgresql import JSONB, TSVECTOR, UUID
+from sqlalchemy.orm import deferred
 
 from ..db.base_class import Base
 
@@ -19,6 +20,8 @@ class Place(Base):
     thumbnail_url = Column(String(512))
     hero_image_url = Column(String(512))
     location = Column(JSONB)
+    latitude = Column(Float)
+    longitude = Column(Float)
     contact = Column(JSONB)
     tags = Column(JSONB, default=list)
     is_public = Column(Boolean, nullable=False, default=True)
@@ -26,6 +29,25 @@ class Place(Base):
     status = Column(String(32), nullable=False, default="active", index=True)
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    search_vector = deferred(
+        Column(
+            TSVECTOR,
+            Computed(
+                "setweight(to_tsvector('spanish', coalesce(name, '')), 'A') || "
+                "setweight(jsonb_to_tsvector('spanish', coalesce(tags, '[]'::jsonb), '[\"string\"]'), 'B') || "
+                "setweight(to_tsvector('spanish', coalesce(description, '')), 'C')",
+                persisted=True,
+            ),
+        )
+    )
+
+    __table_args__ = (
+        Index("ix_places_created_id", "created_at", "id"),
+        Index("ix_places_search", "search_vector", postgresql_using="gin"),
+    )
+
+
+Index("ix_places_point", func.point(Place.longitude, Place.latitude), postgresql_using="gist")
 
 
 class PlaceProduct(Base):
@@ -55,9 +77,16 @@ class MapEvent(Base):
     start_at = Column(DateTime, nullable=False)
     end_at = Column(DateTime, nullable=False)
     location = Column(JSONB)
+    latitude = Column(Float)
+    longitude = Column(Float)
     contact = Column(JSONB)
     banner_url = Column(String(512))
     is_featured = Column(Boolean, default=False)
     visibility = Column(String(32), nullable=False, default="public", index=True)
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    __table_args__ = (Index("ix_map_events_start_id", "start_at", "id"),)
+
+
+Index("ix_map_events_point", func.point(MapEvent.longitude, MapEvent.latitude), postgresql_using="gist")
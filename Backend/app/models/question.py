@@ -2,8 +2,9 @@ import enum
 import uuid
 from datetime import datetime
 
-from sqlalchemy import Boolean, Column, DateTime, ForeignKey, Integer, String, Text, UniqueConstraint
-from sqlalchemy.dialects.postgresql import JSONB, UUID
+from sqlalchemy import Boolean, Column, Computed, DateTime, ForeignKey, Index, Integer, String, Text, UniqueConstraint
+from sqlalchemy.dialects.postgresql import JSONB, TSVECTOR, UUID
+from sqlalchemy.orm import deferred
 
 from ..db.base_class import Base
 
@@ -27,6 +28,21 @@ class Question(Base):
     active = Column(Boolean, default=True)
     created_by = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow)
+    search_vector = deferred(
+        Column(
+            TSVECTOR,
+            Computed(
+                "setweight(to_tsvector('spanish', coalesce(title, '')), 'A') || "
+                "setweight(to_tsvector('spanish', coalesce(body, '')), 'B')",
+                persisted=True,
+            ),
+        )
+    )
+
+    __table_args__ = (
+        Index("ix_questions_created_id", "created_at", "id"),
+        Index("ix_questions_search", "search_vector", postgresql_using="gin"),
+    )
 
 
 class QuestionResponse(Base):
@@ -40,6 +56,8 @@ class QuestionResponse(Base):
     coins_awarded = Column(Integer, default=0)
     created_at = Column(DateTime, default=datetime.utcnow)
 
+    __table_args__ = (Index("ix_question_responses_created_id", "created_at", "id"),)
+
 
 class QuestionCredit(Base):
     __tablename__ = "question_credits"
@@ -12,6 +12,7 @@ __all__ = [
     "news",
     "places",
     "questions",
+    "search",
     "users",
     "wellness",
 ]
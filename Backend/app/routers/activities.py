@@ -1,14 +1,15 @@
 from datetime import datetime, timezone
-from typing import List
+from typing import List, Literal, Optional
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy import text
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy import or_, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from app.core.deps import get_db, require_professor, require_student, require_role
+from app.core.deps import get_async_db, get_db, require_professor, require_student, require_role
 from app.models.activity import Activity, ActivityTarget, ActivityStatus, ActivityType
-from app.models.coins import CoinsLedger
 from app.models.group import Group, GroupMembership
 from app.models.submission import Submission, SubmissionStatus
 from app.models.user import User
@@ -19,7 +20,15 @@ from app.schemas.activity import (
     ActivitySubmissionOut,
     ActivityTargetOut,
     AnswerIn,
+    BulkGradeIn,
+    BulkGradeOut,
 )
+from app.services import export_service
+from app.services.analytics_service import bump_group_stats
+from app.services.coins_service import record_coins_bulk
+from app.services.grading import GradingSpec, get_spec, invalidate_spec
+from app.services.submission_service import apply_grades, insert_submission
+from app.services.visibility_service import fan_out_activity
 
 router = APIRouter()
 
@@ -78,6 +87,7 @@ def create_activity(body: ActivityCreate, user=Depends(require_prof_or_super), d
     db.add(a); db.commit(); db.refresh(a)
     for gid in body.target_group_ids:
         db.add(ActivityTarget(activity_id=a.id, group_id=gid))
+    bump_group_stats(db, body.target_group_ids, activity_count=1)
     db.commit()
     return {"id": str(a.id)}
 
@@ -107,6 +117,81 @@ def list_group_activities(group_id: UUID, user=Depends(require_prof_or_super), d
         for a in rows
     ]
 
+@router.get("/visible")
+async def my_visible_activities(user=Depends(require_any_user), db: AsyncSession = Depends(get_async_db)):
+    # Lectura sobre activity_visibility (fan-out por estudiante); q_correct no se expone.
+    sql = """
+    select a.id, a.title, a.description, a.type, a.q_text, a.q_type, a.q_options,
+           a.coins_on_complete, a.start_at, a.end_at, a.status, a.created_by, a.created_at
+    from activity_visibility v
+    join activities a on a.id = v.activity_id
+    where v.user_id = :uid
+      and (v.start_at is null or v.start_at <= now())
+      and (v.end_at   is null or v.end_at   >= now())
+      and a.status = 'published'
+    order by v.start_at nulls first, v.created_at desc
+    """
+    rows = (await db.execute(text(sql), {"uid": UUID(user["sub"])})).mappings().all()
+    return [dict(r) for r in rows]
+
+@router.get("/export")
+def export_submissions(
+    activity_id: Optional[UUID] = None,
+    group_id: Optional[UUID] = None,
+    format: Literal["csv", "parquet"] = Query("csv"),
+    gzip: bool = False,
+    user=Depends(require_prof_or_super),
+    db: Session = Depends(get_db),
+) -> StreamingResponse:
+    if activity_id and group_id:
+        raise HTTPException(status_code=400, detail="use either activity_id or group_id")
+    if format == "parquet" and not export_service.parquet_available():
+        raise HTTPException(status_code=501, detail="parquet export requires pyarrow")
+
+    stmt = export_service.submissions_query()
+    if activity_id:
+        activity = db.get(Activity, activity_id)
+        if not activity:
+            raise HTTPException(status_code=404, detail="activity not found")
+        _ensure_activity_access(db, activity, user)
+        stmt = stmt.where(Submission.activity_id == activity_id)
+        scope = f"activity-{activity_id}"
+    elif group_id:
+        _ensure_group_access(db, group_id, user)
+        stmt = stmt.where(
+            Submission.activity_id.in_(select(ActivityTarget.activity_id).where(ActivityTarget.group_id == group_id)),
+            Submission.user_id.in_(select(GroupMembership.user_id).where(GroupMembership.group_id == group_id)),
+        )
+        scope = f"group-{group_id}"
+    else:
+        # Todo el curso: las mismas actividades que _ensure_activity_access deja ver,
+        # propias o dirigidas a un grupo del profesor (el superusuario exporta todo).
+        if user["role"] == "professor":
+            owned_targets = (
+                select(ActivityTarget.activity_id)
+                .join(Group, Group.id == ActivityTarget.group_id)
+                .where(Group.created_by == user["sub"])
+            )
+            stmt = stmt.where(or_(Activity.created_by == user["sub"], Activity.id.in_(owned_targets)))
+        scope = "course"
+    # La respuesta sobrevive a la sesión de la petición; el generador abre la suya.
+    db.close()
+
+    if format == "parquet":
+        body = export_service.iter_parquet(stmt, compression="gzip" if gzip else "snappy")
+        media_type, filename = "application/vnd.apache.parquet", f"submissions-{scope}.parquet"
+    else:
+        body = export_service.iter_csv(stmt, gzip=gzip)
+        media_type, filename = "text/csv; charset=utf-8", f"submissions-{scope}.csv"
+        if gzip:
+            media_type, filename = "application/gzip", filename + ".gz"
+    return StreamingResponse(
+        body,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
 @router.get("/{activity_id}", response_model=ActivityDetailOut)
 def get_activity_detail(activity_id: UUID, user=Depends(require_prof_or_super), db: Session = Depends(get_db)):
     activity = db.get(Activity, activity_id)
@@ -168,75 +253,102 @@ def publish_activity(activity_id: str, db: Session = Depends(get_db)):
     a = db.get(Activity, activity_id)
     if not a: raise HTTPException(status_code=404, detail="not found")
     a.status = ActivityStatus.published
+    a.version = (a.version or 0) + 1
+    db.flush()
+    fan_out_activity(db, a.id)
     db.commit()
+    invalidate_spec(a.id)
     return {"published": True}
 
-@router.get("/visible")
-def my_visible_activities(user=Depends(require_any_user), db: Session = Depends(get_db)):
-    sql = """
-    select distinct a.*
-    from activities a
-    join activity_targets t on t.activity_id = a.id
-    join group_membership gm on gm.group_id = t.group_id
-    where gm.user_id = :uid
-      and a.status = 'published'
-      and (a.start_at is null or a.start_at <= now())
-      and (a.end_at   is null or a.end_at   >= now())
-    order by a.start_at nulls first, a.created_at desc
-    """
-    rows = db.execute(text(sql), {"uid": user["sub"]}).mappings().all()
-    return [dict(r) for r in rows]
+@router.post("/{activity_id}/grades", response_model=BulkGradeOut)
+def grade_submissions(
+    activity_id: UUID,
+    body: BulkGradeIn,
+    user=Depends(require_prof_or_super),
+    db: Session = Depends(get_db),
+) -> BulkGradeOut:
+    activity = db.get(Activity, activity_id)
+    if not activity:
+        raise HTTPException(status_code=404, detail="activity not found")
+    _ensure_activity_access(db, activity, user)
+
+    # Si una entrega viene repetida gana la última calificación.
+    grades = {g.submission_id: g for g in body.grades}
+    results = apply_grades(
+        db,
+        activity.id,
+        user["sub"],
+        [(g.submission_id, SubmissionStatus(g.status), g.score, g.coins) for g in grades.values()],
+    )
+    record_coins_bulk(
+        db,
+        [(r.user_id, r.delta) for r in results],
+        reason="Activity grading",
+        activity_id=activity.id,
+    )
+    db.commit()
+
+    updated = {r.submission_id for r in results}
+    return BulkGradeOut(
+        activity_id=activity.id,
+        updated=len(updated),
+        missing=[sid for sid in grades if sid not in updated],
+        coins_delta=sum(r.delta for r in results),
+    )
 
-def _auto_grade(a: Activity, ans: AnswerIn):
-    if a.type != ActivityType.quiz_single: return None, 0
-    selected = (ans.selected or [])
-    correct = (a.q_correct or [])
-    is_correct = (selected == correct)
-    awarded = a.coins_on_complete if is_correct else 0
-    return is_correct, awarded
+def _auto_grade(spec: GradingSpec, ans: AnswerIn):
+    return spec.grade(ans.selected)
 
 @router.post("/{activity_id}/submissions")
-def submit(activity_id: str, body: AnswerIn, user=Depends(require_any_user), db: Session = Depends(get_db)):
-    a = db.get(Activity, activity_id)
-    if not a: raise HTTPException(status_code=404, detail="activity not found")
-    if a.status != ActivityStatus.published:
-        raise HTTPException(status_code=400, detail="not published")
-
-    now = datetime.now(timezone.utc)
-    start = _as_utc(a.start_at)
-    end   = _as_utc(a.end_at)
-
-    if start and now < start: raise HTTPException(status_code=400, detail="not started")
-    if end   and now > end:   raise HTTPException(status_code=400, detail="ended")
-
-    sql = text("""
-    select 1
-    from activity_targets t
-    join group_membership gm on gm.group_id = t.group_id
-    where t.activity_id = :aid and gm.user_id = :uid
-    limit 1
-    """)
-    ok = db.execute(sql, {"aid": str(a.id), "uid": str(user["sub"])}).first()
-    if not ok: raise HTTPException(status_code=403, detail="not allowed")
-
-    dup = db.query(Submission).filter(Submission.activity_id == a.id, Submission.user_id == user["sub"]).first()
-    if dup: raise HTTPException(status_code=400, detail="already submitted")
-
-    sub = Submission(activity_id=a.id, user_id=user["sub"], answer=body.model_dump())
-    if a.type == ActivityType.quiz_single:
-        is_correct, awarded = _auto_grade(a, body)
-        sub.is_correct = is_correct
-        sub.status = SubmissionStatus.approved if is_correct else SubmissionStatus.submitted
-        sub.awarded_coins = awarded
-        db.add(sub); db.commit(); db.refresh(sub)
-        if awarded > 0:
-            db.add(CoinsLedger(user_id=user["sub"], activity_id=a.id, delta=awarded, reason="Activity completion (auto)"))
-            db.commit()
+def submit(activity_id: UUID, body: AnswerIn, user=Depends(require_any_user), db: Session = Depends(get_db)):
+    # La especificación cacheada se valida contra Activity.version al insertar;
+    # si quedó vieja se recarga una vez.
+    for attempt in range(2):
+        spec = get_spec(db, activity_id, refresh=attempt > 0)
+        if not spec: raise HTTPException(status_code=404, detail="activity not found")
+        if spec.status != ActivityStatus.published:
+            raise HTTPException(status_code=400, detail="not published")
+
+        now = datetime.now(timezone.utc)
+        start = _as_utc(spec.start_at)
+        end   = _as_utc(spec.end_at)
+
+        if start and now < start: raise HTTPException(status_code=400, detail="not started")
+        if end   and now > end:   raise HTTPException(status_code=400, detail="ended")
+
+        is_correct, awarded = _auto_grade(spec, body)
+        if spec.type == ActivityType.quiz_single:
+            status = SubmissionStatus.approved if is_correct else SubmissionStatus.submitted
+        else:
+            status = SubmissionStatus.submitted
+
+        # Membresía, inserción, monedas y contadores en una sola sentencia.
+        result = insert_submission(
+            db,
+            spec,
+            user_id=user["sub"],
+            answer=body.model_dump(),
+            is_correct=is_correct,
+            status=status,
+            awarded_coins=awarded,
+        )
+        if result.fresh:
+            break
+        db.rollback()
+        invalidate_spec(activity_id)
     else:
-        db.add(sub); db.commit(); db.refresh(sub)
+        raise HTTPException(status_code=409, detail="activity changed, retry")
+
+    if not result.allowed:
+        db.rollback()
+        raise HTTPException(status_code=403, detail="not allowed")
+    if result.submission_id is None:
+        db.rollback()
+        raise HTTPException(status_code=400, detail="already submitted")
+    db.commit()
     return {
-        "submission_id": str(sub.id),
-        "status": sub.status.value,
-        "is_correct": sub.is_correct,
-        "awarded_coins": sub.awarded_coins
+        "submission_id": str(result.submission_id),
+        "status": status.value,
+        "is_correct": is_correct,
+        "awarded_coins": awarded
     }
@@ -99,3 +99,4 @@ def register(body: RegisterIn, db: Session = Depends(get_db)):
 def register_student(body: RegisterIn, db: Session = Depends(get_db)):
     user = _create_user(body, db, Role.student)
     return _token_response(user)
+
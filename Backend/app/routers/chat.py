@@ -1,21 +1,27 @@
+import json
 from typing import List
 from uuid import UUID
 
+import anyio
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy import func
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 
 from app.core.deps import get_db, require_role
+from app.db.session import SessionLocal
 from app.models.chats import ChatSession, ChatMessage
-from app.models.coins import CoinsLedger
 from app.schemas.chat import (
     ChatMessageCreate,
     ChatMessageOut,
     ChatSessionCreate,
     ChatSessionOut,
 )
+from app.services.chat_cache import get_reply_cache
+from app.services.chat_context import ChatContext, apply_summary, build_context, refresh_summary
 from app.services.chat_policy import DEFAULT_POLICY
-from app.services.chat_service import generate_ai_reply
+from app.services.chat_service import generate_ai_reply, stream_ai_reply
+from app.services.coins_service import get_balance, record_coins
 
 router = APIRouter()
 require_any_user = require_role("student", "professor", "superuser", "communications")
@@ -30,13 +36,9 @@ def _ensure_session(session: ChatSession | None, user_payload: dict) -> ChatSess
     return session
 
 
-def _current_balance(db: Session, user_id: UUID) -> int:
-    total = (
-        db.query(func.coalesce(func.sum(CoinsLedger.delta), 0))
-        .filter(CoinsLedger.user_id == user_id)
-        .scalar()
-    )
-    return total or 0
+def _current_balance(db: Session, user_id: UUID, for_update: bool = False) -> int:
+    total, _ = get_balance(db, user_id, for_update=for_update)
+    return total
 
 
 @router.post("/sessions", response_model=ChatSessionOut, status_code=status.HTTP_201_CREATED)
@@ -81,15 +83,20 @@ def list_messages(
     )
 
 
-@router.post("/sessions/{session_id}/messages", response_model=ChatMessageOut)
-def send_message(
-    session_id: UUID,
-    body: ChatMessageCreate,
-    user=Depends(require_any_user),
-    db: Session = Depends(get_db),
-) -> ChatMessageOut:
-    session = _ensure_session(db.get(ChatSession, session_id), user)
+@router.get("/cache/stats")
+def reply_cache_stats(_: dict = Depends(require_role("superuser"))) -> dict:
+    cache = get_reply_cache()
+    return cache.stats() if cache else {"enabled": False}
+
 
+def _charge_and_store(db: Session, session: ChatSession, body: ChatMessageCreate) -> tuple[ChatContext, UUID]:
+    """Locks the balance, debits the reply and stores the user message; commits.
+
+    Debiting before the model runs keeps two concurrent requests from
+    spending the same coins. Returns the prompt context and the message id.
+    """
+    if _current_balance(db, session.user_id, for_update=True) < COINS_PER_RESPONSE:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="insufficient coins")
     user_message = ChatMessage(
         session_id=session.id,
         role="user",
@@ -97,25 +104,58 @@ def send_message(
         attachments=body.attachments,
     )
     db.add(user_message)
+    record_coins(db, user_id=session.user_id, delta=-COINS_PER_RESPONSE, reason="Chat IA")
+    session.coins_spent += COINS_PER_RESPONSE
     db.flush()
+    context = build_context(db, session)
+    message_id = user_message.id
+    db.commit()
+    return context, message_id
 
-    history = (
-        db.query(ChatMessage)
-        .filter(ChatMessage.session_id == session.id)
-        .order_by(ChatMessage.created_at.asc())
-        .all()
+
+def _refund_message(db: Session, session_id: UUID, user_id: UUID, message_id: UUID) -> None:
+    """Undoes ``_charge_and_store`` when the model call fails."""
+    db.query(ChatMessage).filter(ChatMessage.id == message_id).delete(synchronize_session=False)
+    record_coins(db, user_id=user_id, delta=COINS_PER_RESPONSE, reason="Chat IA (reembolso)")
+    db.query(ChatSession).filter(ChatSession.id == session_id).update(
+        {ChatSession.coins_spent: ChatSession.coins_spent - COINS_PER_RESPONSE},
+        synchronize_session=False,
     )
-    formatted_history = [
-        {"role": msg.role, "content": msg.content}
-        for msg in history
-    ]
+    db.commit()
 
-    balance = _current_balance(db, session.user_id)
-    if balance < COINS_PER_RESPONSE:
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="insufficient coins")
 
-    reply = generate_ai_reply(formatted_history)
+@router.post("/sessions/{session_id}/messages", response_model=ChatMessageOut)
+def send_message(
+    session_id: UUID,
+    body: ChatMessageCreate,
+    user=Depends(require_any_user),
+    db: Session = Depends(get_db),
+) -> ChatMessageOut:
+    # Fase 1: validar, cobrar y guardar el mensaje del usuario; el commit devuelve
+    # la conexión al pool.
+    session = _ensure_session(db.get(ChatSession, session_id), user)
+    session_id, user_id = session.id, session.user_id
+    context, user_message_id = _charge_and_store(db, session, body)
+    cache = get_reply_cache() if not body.attachments and context.is_single_turn() else None
+
+    # Fase 2: llamar al modelo sin conexión tomada. No tocar objetos ORM aquí:
+    # tras el commit están expirados y leerlos volvería a pedir una conexión.
+    reply = cache.lookup(body.content) if cache else None
+    if reply is None:
+        try:
+            reply = generate_ai_reply(context.messages())
+        except Exception:
+            _refund_message(db, session_id, user_id, user_message_id)
+            raise HTTPException(status_code=status.HTTP_502_BAD_GATEWAY, detail="chat model unavailable")
+        if cache:
+            cache.store(body.content, reply)
+    refresh_summary(context)
 
+    # Fase 3: volver a tomar una conexión para guardar la respuesta.
+    session = db.get(ChatSession, session_id)
+    if session is None:
+        # El chat se borró mientras respondía el modelo; el cobro se mantiene.
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="session not found")
     assist_message = ChatMessage(
         session_id=session.id,
         role="assistant",
@@ -123,14 +163,102 @@ def send_message(
         coins_delta=-COINS_PER_RESPONSE,
     )
     db.add(assist_message)
-    db.add(
-        CoinsLedger(
-            user_id=session.user_id,
-            delta=-COINS_PER_RESPONSE,
-            reason="Chat IA",
-        )
-    )
-    session.coins_spent += COINS_PER_RESPONSE
+    apply_summary(session, context)
     db.commit()
     db.refresh(assist_message)
     return assist_message
+
+
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+def _refund_stream(session_id: UUID, user_id: UUID, message_id: UUID) -> None:
+    db = SessionLocal()
+    try:
+        _refund_message(db, session_id, user_id, message_id)
+    finally:
+        db.close()
+
+
+def _persist_streamed_reply(session_id: UUID, reply: str, context: ChatContext) -> ChatMessageOut:
+    db = SessionLocal()
+    try:
+        session = db.get(ChatSession, session_id)
+        if session is None:
+            # El chat se borró durante el stream; el cobro se mantiene como en send_message.
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="session not found")
+        assist_message = ChatMessage(
+            session_id=session.id,
+            role="assistant",
+            content=reply,
+            coins_delta=-COINS_PER_RESPONSE,
+        )
+        db.add(assist_message)
+        apply_summary(session, context)
+        db.commit()
+        db.refresh(assist_message)
+        return ChatMessageOut.model_validate(assist_message)
+    finally:
+        db.close()
+
+
+@router.post("/sessions/{session_id}/messages/stream")
+def stream_message(
+    session_id: UUID,
+    body: ChatMessageCreate,
+    user=Depends(require_any_user),
+    db: Session = Depends(get_db),
+) -> StreamingResponse:
+    """Streams the assistant reply as Server-Sent Events.
+
+    Emits ``token`` events while the model writes, then a single ``done``
+    event with the stored message. The user message and the coin debit are
+    committed before the model is called, as in ``send_message``; a model
+    error or a dropped client deletes the message and refunds the coins.
+    """
+    session = _ensure_session(db.get(ChatSession, session_id), user)
+    session_id, user_id = session.id, session.user_id
+    context, user_message_id = _charge_and_store(db, session, body)
+    cache = get_reply_cache() if not body.attachments and context.is_single_turn() else None
+    # Devuelve la conexión al pool antes de esperar al modelo.
+    db.close()
+
+    async def events():
+        parts: List[str] = []
+        streamed = False
+        try:
+            # La caché puede ser Redis u otro backend bloqueante: fuera del event loop.
+            cached = await run_in_threadpool(cache.lookup, body.content) if cache else None
+            if cached is not None:
+                parts.append(cached)
+                yield _sse("token", {"content": cached})
+            else:
+                try:
+                    async for token in stream_ai_reply(context.messages()):
+                        parts.append(token)
+                        yield _sse("token", {"content": token})
+                except Exception:
+                    yield _sse("error", {"detail": "chat model unavailable"})
+                    return
+                if cache:
+                    await run_in_threadpool(cache.store, body.content, "".join(parts))
+            streamed = True
+        finally:
+            if not streamed:
+                # Protegido: si el cliente se fue, la tarea ya está cancelada.
+                with anyio.CancelScope(shield=True):
+                    await run_in_threadpool(_refund_stream, session_id, user_id, user_message_id)
+        await run_in_threadpool(refresh_summary, context)
+        try:
+            message = await run_in_threadpool(_persist_streamed_reply, session_id, "".join(parts), context)
+        except HTTPException as exc:
+            yield _sse("error", {"detail": exc.detail})
+            return
+        yield _sse("done", message.model_dump(mode="json"))
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -1,19 +1,23 @@
 from datetime import datetime
-from typing import List
+from typing import List, Optional
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
-from sqlalchemy import func
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from app.core.deps import get_db, require_role
+from app.core.deps import get_async_db, get_db, require_role
+from app.core.pagination import Keyset, SortKey
 from app.models.coins import CoinsLedger
 from app.models.user import User
 from app.schemas.coins import CoinAdjustIn, CoinBalance, CoinLedgerEntry
+from app.services.coins_service import get_balance_async, record_coins
 
 router = APIRouter()
 require_any_user = require_role("student", "professor", "superuser", "communications")
 
+ledger_keyset = Keyset(SortKey(CoinsLedger.created_at, descending=True), SortKey(CoinsLedger.id, descending=True))
+
 
 def _fetch_user(db: Session, user_id: UUID) -> User:
     user = db.get(User, user_id)
@@ -23,39 +27,23 @@ def _fetch_user(db: Session, user_id: UUID) -> User:
 
 
 @router.get("/me", response_model=CoinBalance)
-def my_balance(user=Depends(require_any_user), db: Session = Depends(get_db)) -> CoinBalance:
-    total = (
-        db.query(func.coalesce(func.sum(CoinsLedger.delta), 0))
-        .filter(CoinsLedger.user_id == user["sub"])
-        .scalar()
-        or 0
-    )
-    last_row = (
-        db.query(CoinsLedger.created_at)
-        .filter(CoinsLedger.user_id == user["sub"])
-        .order_by(CoinsLedger.created_at.desc())
-        .first()
-    )
-    last_updated = last_row.created_at if last_row else datetime.utcnow()
-    return CoinBalance(balance=total, last_updated=last_updated)
+async def my_balance(user=Depends(require_any_user), db: AsyncSession = Depends(get_async_db)) -> CoinBalance:
+    total, last_updated = await get_balance_async(db, UUID(user["sub"]))
+    return CoinBalance(balance=total, last_updated=last_updated or datetime.utcnow())
 
 
 @router.get("/me/ledger", response_model=List[CoinLedgerEntry])
 def my_ledger(
+    response: Response,
     user=Depends(require_any_user),
     db: Session = Depends(get_db),
     limit: int = Query(50, ge=1, le=200),
     offset: int = Query(0, ge=0),
+    cursor: Optional[str] = None,
 ) -> List[CoinLedgerEntry]:
-    rows = (
-        db.query(CoinsLedger)
-        .filter(CoinsLedger.user_id == user["sub"])
-        .order_by(CoinsLedger.created_at.desc())
-        .offset(offset)
-        .limit(limit)
-        .all()
-    )
-    return rows
+    query = db.query(CoinsLedger).filter(CoinsLedger.user_id == user["sub"])
+    rows = ledger_keyset.apply(query, cursor, limit, offset).all()
+    return ledger_keyset.page(rows, limit, response)
 
 
 @router.post("/adjust", response_model=CoinLedgerEntry, status_code=status.HTTP_201_CREATED)
@@ -65,13 +53,13 @@ def adjust_balance(
     db: Session = Depends(get_db),
 ) -> CoinLedgerEntry:
     _fetch_user(db, body.user_id)
-    entry = CoinsLedger(
+    entry = record_coins(
+        db,
         user_id=body.user_id,
         delta=body.delta,
         reason=body.reason,
         activity_id=body.activity_id,
     )
-    db.add(entry)
     db.commit()
     db.refresh(entry)
     return entry
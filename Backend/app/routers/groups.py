@@ -1,23 +1,32 @@
+import csv
+import hashlib
 import io
 import secrets
 import string
 from datetime import datetime
 from typing import List
-from uuid import UUID
+from uuid import UUID, uuid4
 
 import qrcode
-from fastapi import APIRouter, Depends, HTTPException, Response, status
-from sqlalchemy import func
+from fastapi import APIRouter, Depends, File, Form, HTTPException, Query, Request, Response, UploadFile, status
+from pydantic import EmailStr, TypeAdapter, ValidationError
+from qrcode.image.svg import SvgPathImage
+from sqlalchemy import and_, func, text, update
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.orm import Session
 
+from app.core.cache import LRUCache
 from app.core.config import settings
 from app.core.deps import get_db, require_role, require_student
 from app.models.activity import ActivityTarget
 from app.models.group import Group, GroupMembership
 from app.models.invite import InviteCode
 from app.models.question import Question, QuestionTarget
-from app.models.user import User
+from app.models.user import Role, User
 from app.schemas.group import (
+    BulkEnrollIn,
+    BulkEnrollOut,
+    BulkEnrollRow,
     GroupCreate,
     GroupDetail,
     GroupOut,
@@ -26,6 +35,8 @@ from app.schemas.group import (
     JoinByCode,
     GroupQuestionSummary,
 )
+from app.services.analytics_service import bump_group_stats, drop_group_stats
+from app.services.visibility_service import grant_group_activities, revoke_group
 
 router = APIRouter()
 require_prof_or_super = require_role("professor", "superuser")
@@ -166,6 +177,7 @@ def create_group(
     db.refresh(group)
 
     db.add(GroupMembership(group_id=group.id, user_id=user["sub"], role_in_group="owner"))
+    bump_group_stats(db, [group.id], member_count=1)
     db.commit()
 
     code = _code(8)
@@ -203,33 +215,230 @@ def create_invite(
     return {"code": invite.code}
 
 
-@router.post("/join", dependencies=[Depends(require_student)])
-def join_group(body: JoinByCode, user=Depends(require_student), db: Session = Depends(get_db)):
+# Canjea la invitación y crea la membresía en una sola sentencia. La condición
+# sobre uses se reevalúa sobre la fila bloqueada, así que uniones concurrentes
+# nunca superan max_uses.
+_REDEEM_INVITE = text(
+    """
+    WITH redeemed AS (
+        UPDATE invite_codes AS i
+        SET uses = coalesce(i.uses, 0) + 1
+        WHERE i.code = :code
+          AND i.is_active
+          AND (i.expires_at IS NULL OR i.expires_at >= :now)
+          AND (i.max_uses IS NULL OR i.max_uses = 0 OR coalesce(i.uses, 0) < i.max_uses)
+          AND NOT EXISTS (
+              SELECT 1 FROM group_membership gm WHERE gm.group_id = i.group_id AND gm.user_id = :uid
+          )
+        RETURNING i.id, i.group_id
+    ),
+    joined AS (
+        INSERT INTO group_membership (id, group_id, user_id, role_in_group, created_at)
+        SELECT :mid, group_id, :uid, 'student', :now FROM redeemed
+        ON CONFLICT ON CONSTRAINT uq_group_user DO NOTHING
+        RETURNING group_id
+    )
+    SELECT
+        (SELECT id FROM redeemed) AS invite_id,
+        (SELECT group_id FROM redeemed) AS redeemed_group,
+        (SELECT group_id FROM joined) AS joined_group
+    """
+)
+
+
+def _join_failure(db: Session, code: str, user_id: str) -> dict:
     invite = (
         db.query(InviteCode)
-        .filter(InviteCode.code == body.code, InviteCode.is_active.is_(True))
+        .filter(InviteCode.code == code, InviteCode.is_active.is_(True))
         .first()
     )
     if not invite:
         raise HTTPException(status_code=400, detail="invalid code")
+    member = (
+        db.query(GroupMembership.id)
+        .filter(GroupMembership.group_id == invite.group_id, GroupMembership.user_id == user_id)
+        .first()
+    )
+    if member:
+        return {"joined": True, "status": "already_member", "group_id": str(invite.group_id)}
     if invite.expires_at and invite.expires_at < datetime.utcnow():
         raise HTTPException(status_code=400, detail="expired code")
-    if invite.max_uses and invite.uses >= invite.max_uses:
-        raise HTTPException(status_code=400, detail="max uses reached")
-
-    exists = (
-        db.query(GroupMembership)
-        .filter(
-            GroupMembership.group_id == invite.group_id,
-            GroupMembership.user_id == user["sub"],
+    raise HTTPException(status_code=400, detail="max uses reached")
+
+
+@router.post("/join", dependencies=[Depends(require_student)])
+def join_group(body: JoinByCode, user=Depends(require_student), db: Session = Depends(get_db)):
+    row = db.execute(
+        _REDEEM_INVITE,
+        {"code": body.code, "uid": user["sub"], "mid": str(uuid4()), "now": datetime.utcnow()},
+    ).one()
+    if row.joined_group is not None:
+        bump_group_stats(db, [row.joined_group], member_count=1)
+        grant_group_activities(db, row.joined_group, [user["sub"]])
+        db.commit()
+        return {"joined": True, "status": "joined", "group_id": str(row.joined_group)}
+    if row.redeemed_group is not None:
+        # Otra petición del mismo estudiante ganó la carrera: devolver el uso consumido.
+        db.execute(
+            update(InviteCode).where(InviteCode.id == row.invite_id).values(uses=InviteCode.uses - 1)
         )
-        .first()
-    )
-    if not exists:
-        db.add(GroupMembership(group_id=invite.group_id, user_id=user["sub"]))
-        invite.uses += 1
         db.commit()
-    return {"joined": True}
+        return {"joined": True, "status": "already_member", "group_id": str(row.redeemed_group)}
+    db.rollback()
+    return _join_failure(db, body.code, user["sub"])
+
+
+MAX_BULK_ENROLL = 5000
+_email_adapter = TypeAdapter(EmailStr)
+
+
+def _valid_email(raw: str) -> str | None:
+    try:
+        return _email_adapter.validate_python(raw.strip()).lower()
+    except ValidationError:
+        return None
+
+
+def _bulk_enroll(db: Session, group: Group, emails: list[str], invite_code: str | None) -> BulkEnrollOut:
+    invite = None
+    if invite_code:
+        # Bloquea la invitación hasta el commit: los canjes por /join esperan y
+        # el cupo restante no cambia mientras se inscribe el lote.
+        invite = (
+            db.query(InviteCode)
+            .filter(
+                InviteCode.group_id == group.id,
+                InviteCode.code == invite_code,
+                InviteCode.is_active.is_(True),
+            )
+            .with_for_update()
+            .first()
+        )
+        if not invite:
+            raise HTTPException(status_code=400, detail="invalid code")
+        if invite.expires_at and invite.expires_at < datetime.utcnow():
+            raise HTTPException(status_code=400, detail="expired code")
+
+    wanted: list[str | None] = []
+    seen: set[str] = set()
+    duplicates: set[int] = set()
+    for index, raw in enumerate(emails):
+        email = _valid_email(raw)
+        if email is not None:
+            if email in seen:
+                duplicates.add(index)
+            seen.add(email)
+        wanted.append(email)
+
+    users = {
+        email: (user_id, role)
+        for user_id, email, role in (
+            db.query(User.id, func.lower(User.email), User.role)
+            .filter(func.lower(User.email).in_(seen))
+            .all()
+        )
+    }
+    student_ids = list(dict.fromkeys(
+        users[email][0] for email in wanted if email in users and users[email][1] == Role.student
+    ))
+
+    if invite and invite.max_uses:
+        # Mismo cupo que _REDEEM_INVITE: solo los primeros estudiantes nuevos caben.
+        remaining = max(invite.max_uses - (invite.uses or 0), 0)
+        members = {
+            user_id
+            for (user_id,) in db.query(GroupMembership.user_id).filter(
+                GroupMembership.group_id == group.id, GroupMembership.user_id.in_(student_ids)
+            )
+        }
+        newcomers = [uid for uid in student_ids if uid not in members]
+        student_ids = [uid for uid in student_ids if uid in members] + newcomers[:remaining]
+
+    enrolled: set = set()
+    if student_ids:
+        stmt = (
+            insert(GroupMembership)
+            .values([{"group_id": group.id, "user_id": uid, "role_in_group": "student"} for uid in student_ids])
+            .on_conflict_do_nothing(constraint="uq_group_user")
+            .returning(GroupMembership.user_id)
+        )
+        enrolled = set(db.execute(stmt).scalars().all())
+    if enrolled:
+        if invite:
+            db.execute(
+                update(InviteCode)
+                .where(InviteCode.id == invite.id)
+                .values(uses=func.coalesce(InviteCode.uses, 0) + len(enrolled))
+            )
+        bump_group_stats(db, [group.id], member_count=len(enrolled))
+        grant_group_activities(db, group.id, enrolled)
+    db.commit()
+
+    rows: list[BulkEnrollRow] = []
+    for index, email in enumerate(wanted):
+        user_id, role = users.get(email, (None, None))
+        if email is None:
+            status_ = "invalid_email"
+        elif index in duplicates:
+            status_ = "duplicate"
+        elif user_id is None:
+            status_ = "not_found"
+        elif role != Role.student:
+            status_ = "not_student"
+        elif user_id in enrolled:
+            status_ = "enrolled"
+        elif user_id not in student_ids:
+            status_ = "invite_full"
+        else:
+            status_ = "already_member"
+        rows.append(BulkEnrollRow(email=email or emails[index].strip(), status=status_, user_id=user_id))
+    already = sum(1 for row in rows if row.status == "already_member")
+    return BulkEnrollOut(
+        group_id=group.id,
+        enrolled=len(enrolled),
+        already_member=already,
+        rejected=len(rows) - len(enrolled) - already,
+        rows=rows,
+    )
+
+
+@router.post("/{group_id}/members/bulk", response_model=BulkEnrollOut)
+def bulk_enroll(
+    group_id: UUID,
+    body: BulkEnrollIn,
+    db: Session = Depends(get_db),
+    user=Depends(require_prof_or_super),
+) -> BulkEnrollOut:
+    group, _ = _get_group_with_owner(db, group_id)
+    _ensure_permissions(group, user)
+    return _bulk_enroll(db, group, body.emails, body.invite_code)
+
+
+@router.post("/{group_id}/members/bulk/csv", response_model=BulkEnrollOut)
+def bulk_enroll_csv(
+    group_id: UUID,
+    file: UploadFile = File(...),
+    invite_code: str | None = Form(None),
+    db: Session = Depends(get_db),
+    user=Depends(require_prof_or_super),
+) -> BulkEnrollOut:
+    group, _ = _get_group_with_owner(db, group_id)
+    _ensure_permissions(group, user)
+
+    text_stream = io.TextIOWrapper(file.file, encoding="utf-8-sig")
+    rows = [row for row in csv.reader(text_stream) if any(cell.strip() for cell in row)]
+    column = 0
+    if rows:
+        header = [cell.strip().lower() for cell in rows[0]]
+        if "email" in header or "correo" in header:
+            column = header.index("email") if "email" in header else header.index("correo")
+            rows = rows[1:]
+    emails = [row[column] for row in rows if len(row) > column and row[column].strip()]
+    if not emails:
+        raise HTTPException(status_code=400, detail="no emails found")
+    if len(emails) > MAX_BULK_ENROLL:
+        raise HTTPException(status_code=413, detail=f"at most {MAX_BULK_ENROLL} rows per upload")
+    return _bulk_enroll(db, group, emails, invite_code)
 
 
 @router.get("/me", response_model=List[GroupOut])
@@ -304,37 +513,124 @@ def delete_group(
     group, _ = _get_group_with_owner(db, group_id)
     _ensure_permissions(group, user)
 
+    revoke_group(db, group.id)
     db.query(GroupMembership).filter(GroupMembership.group_id == group.id).delete(synchronize_session=False)
     db.query(ActivityTarget).filter(ActivityTarget.group_id == group.id).delete(synchronize_session=False)
     db.query(InviteCode).filter(InviteCode.group_id == group.id).delete(synchronize_session=False)
+    drop_group_stats(db, group.id)
     db.delete(group)
     db.commit()
     return Response(status_code=status.HTTP_204_NO_CONTENT)
 
 
+QR_MEDIA_TYPES = {"png": "image/png", "svg": "image/svg+xml"}
+QR_CACHE_CONTROL = "private, max-age=3600"
+# (code, WEB_BASE_URL, size, formato) -> bytes del QR ya renderizado. Solo
+# depende del código; si la invitación sigue activa se comprueba en cada petición.
+qr_cache = LRUCache(256)
+
+
+def _forget_invites(code: str) -> None:
+    qr_cache.discard_where(lambda key: key[0] == code)
+
+
+def _invite_owner(db: Session, group_id: UUID, code: str) -> str:
+    # Sin caché: una invitación desactivada en otro worker deja de servir al instante.
+    row = (
+        db.query(Group.created_by, InviteCode.id)
+        .outerjoin(
+            InviteCode,
+            and_(
+                InviteCode.group_id == Group.id,
+                InviteCode.code == code,
+                InviteCode.is_active.is_(True),
+            ),
+        )
+        .filter(Group.id == group_id)
+        .first()
+    )
+    if row is None:
+        raise HTTPException(status_code=404, detail="group not found")
+    owner_id, invite_id = row
+    if invite_id is None:
+        raise HTTPException(status_code=404, detail="invalid invite")
+    return str(owner_id)
+
+
+def _qr_etag(key: tuple) -> str:
+    return '"' + hashlib.sha256(repr(key).encode("utf-8")).hexdigest()[:32] + '"'
+
+
+def _render_qr(key: tuple) -> bytes:
+    content = qr_cache.get(key)
+    if content is not None:
+        return content
+    code, base_url, size, fmt = key
+    target = f"{base_url}/join?code={code}"
+    buf = io.BytesIO()
+    if fmt == "svg":
+        qrcode.make(target, image_factory=SvgPathImage, box_size=size).save(buf)
+    else:
+        qrcode.make(target, box_size=size).save(buf, format="PNG")
+    content = buf.getvalue()
+    qr_cache.set(key, content)
+    return content
+
+
+def _invite_qr(request: Request, group_id: UUID, code: str, size: int, fmt: str, db: Session, user: dict) -> Response:
+    owner_id = _invite_owner(db, group_id, code)
+    if user.get("role") == "professor" and owner_id != user.get("sub"):
+        raise HTTPException(status_code=403, detail="forbidden")
+
+    key = (code, WEB_BASE_URL, size, fmt)
+    etag = _qr_etag(key)
+    headers = {"ETag": etag, "Cache-Control": QR_CACHE_CONTROL}
+    if etag in [tag.strip() for tag in request.headers.get("if-none-match", "").split(",")]:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=_render_qr(key), media_type=QR_MEDIA_TYPES[fmt], headers=headers)
+
+
 @router.get("/{group_id}/invites/{code}/qr.png")
 def invite_qr_png(
+    request: Request,
     group_id: UUID,
     code: str,
+    size: int = Query(10, ge=2, le=40),
     db: Session = Depends(get_db),
     user=Depends(require_prof_or_super),
 ):
+    return _invite_qr(request, group_id, code, size, "png", db, user)
+
+
+@router.get("/{group_id}/invites/{code}/qr.svg")
+def invite_qr_svg(
+    request: Request,
+    group_id: UUID,
+    code: str,
+    size: int = Query(10, ge=2, le=40),
+    db: Session = Depends(get_db),
+    user=Depends(require_prof_or_super),
+):
+    return _invite_qr(request, group_id, code, size, "svg", db, user)
+
+
+@router.delete("/{group_id}/invites/{code}", status_code=status.HTTP_204_NO_CONTENT)
+def deactivate_invite(
+    group_id: UUID,
+    code: str,
+    db: Session = Depends(get_db),
+    user=Depends(require_prof_or_super),
+) -> Response:
     group, _ = _get_group_with_owner(db, group_id)
     _ensure_permissions(group, user)
     invite = (
         db.query(InviteCode)
-        .filter(
-            InviteCode.group_id == group_id,
-            InviteCode.code == code,
-            InviteCode.is_active.is_(True),
-        )
+        .filter(InviteCode.group_id == group_id, InviteCode.code == code)
         .first()
     )
     if not invite:
         raise HTTPException(status_code=404, detail="invalid invite")
-
-    target = f"{WEB_BASE_URL}/join?code={code}"
-    img = qrcode.make(target)
-    buf = io.BytesIO()
-    img.save(buf, format="PNG")
-    return Response(content=buf.getvalue(), media_type="image/png")
+    invite.is_active = False
+    db.commit()
+    _forget_invites(code)
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
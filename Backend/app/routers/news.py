@@ -1,34 +1,65 @@
 from typing import List, Optional
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from app.core.deps import get_db, require_role
+from app.core.deps import get_async_db, get_db, require_role
+from app.core.pagination import NEXT_CURSOR_HEADER, Keyset, SortKey
 from app.models.news import NewsArticle
 from app.schemas.news import NewsCreate, NewsOut, NewsUpdate
+from app.services import news_feed
 
 router = APIRouter()
 require_any_user = require_role("student", "professor", "superuser", "communications")
 require_news_editor = require_role("professor", "superuser", "communications")
 
+news_keyset = Keyset(
+    SortKey(NewsArticle.publish_at, descending=True, nullable=True),
+    SortKey(NewsArticle.created_at, descending=True),
+    SortKey(NewsArticle.id, descending=True),
+)
+
+
+def _feed_response(request: Request, page: news_feed.FeedPage) -> Response:
+    headers = {"ETag": page.etag, "Cache-Control": "no-cache"}
+    if page.next_cursor:
+        headers[NEXT_CURSOR_HEADER] = page.next_cursor
+    if news_feed.etag_matches(request.headers.get("if-none-match"), page.etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=page.body, media_type="application/json", headers=headers)
+
 
 @router.get("/", response_model=List[NewsOut])
-def list_news(
+async def list_news(
+    request: Request,
     category: Optional[str] = None,
     published: Optional[bool] = None,
     limit: int = Query(20, ge=1, le=200),
     offset: int = Query(0, ge=0),
-    db: Session = Depends(get_db),
-) -> List[NewsOut]:
-    query = db.query(NewsArticle).order_by(NewsArticle.publish_at.desc().nullslast(), NewsArticle.created_at.desc())
-    if category:
-        query = query.filter(NewsArticle.category == category)
-    if published is not None:
-        query = query.filter(NewsArticle.published.is_(published))
-    else:
-        query = query.filter(NewsArticle.published.is_(True))
-    return query.offset(offset).limit(limit).all()
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db),
+) -> Response:
+    # La primera página pública se sirve ya serializada desde memoria.
+    cacheable = published is not False and not cursor and not offset
+    key = (await news_feed.current_version(db), category, limit) if cacheable else None
+    page = news_feed.feed_cache.get(key) if cacheable else None
+    if page is None:
+        query = select(NewsArticle)
+        if category:
+            query = query.where(NewsArticle.category == category)
+        if published is not None:
+            query = query.where(NewsArticle.published.is_(published))
+        else:
+            query = query.where(NewsArticle.published.is_(True))
+        result = await db.execute(news_keyset.apply(query, cursor, limit, offset))
+        rows, next_cursor = news_keyset.split(result.scalars().all(), limit)
+        page = news_feed.render_page(rows, next_cursor)
+        if cacheable:
+            news_feed.feed_cache.set(key, page)
+    return _feed_response(request, page)
 
 
 @router.post("/", response_model=NewsOut, status_code=status.HTTP_201_CREATED)
@@ -52,6 +83,7 @@ def create_news(
     )
     db.add(article)
     db.commit()
+    news_feed.invalidate_feed(db)
     db.refresh(article)
     return article
 
@@ -67,9 +99,15 @@ def update_news(
     if not article:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="article not found")
 
-    for field, value in body.model_dump(exclude_unset=True).items():
+    changes = body.model_dump(exclude_unset=True)
+    # Despublicar sin una nueva fecha cancela la programación; si no, el
+    # programador volvería a publicar el artículo en la siguiente pasada.
+    if changes.get("published") is False and "publish_at" not in changes:
+        changes["publish_at"] = None
+    for field, value in changes.items():
         setattr(article, field, value)
     db.commit()
+    news_feed.invalidate_feed(db)
     db.refresh(article)
     return article
 
@@ -89,5 +127,6 @@ def publish_news(
 
         article.publish_at = datetime.utcnow()
     db.commit()
+    news_feed.invalidate_feed(db)
     db.refresh(article)
     return article
@@ -2,10 +2,13 @@ from datetime import datetime
 from typing import List, Optional
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from app.core.deps import get_db, require_role
+from app.core.deps import get_async_db, get_db, require_role
+from app.core.pagination import Keyset, SortKey
 from app.models.places import MapEvent, Place, PlaceProduct
 from app.schemas.places import (
     PlaceCreate,
@@ -17,6 +20,7 @@ from app.schemas.places import (
     MapEventUpdate,
     MapEventOut,
 )
+from app.services.geo import distance_m, radius_bbox, sync_coordinates, within_bbox
 
 router = APIRouter()
 require_any_user = require_role("student", "professor", "superuser", "communications", "market_manager")
@@ -25,6 +29,9 @@ PLACE_TYPES = ["store", "service", "spot"]
 PLACE_CATEGORIES = ["Comida", "Accesorios", "Hogar", "Papelería", "Café", "Tecnología", "Bienestar"]
 EVENT_CATEGORIES = ["Cultural", "Académico", "Deportivo", "Wellness", "Promoción"]
 
+place_keyset = Keyset(SortKey(Place.created_at, descending=True), SortKey(Place.id, descending=True))
+event_keyset = Keyset(SortKey(MapEvent.start_at), SortKey(MapEvent.id))
+
 
 def _ensure_owner(place: Place, user_payload: dict) -> None:
     if user_payload.get("role") in {"superuser", "market_manager"}:
@@ -40,6 +47,34 @@ def _ensure_event_owner(event: MapEvent, user_payload: dict) -> None:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="forbidden")
 
 
+def _sync_event_coordinates(db: Session, event: MapEvent) -> None:
+    # Un evento sin coordenadas propias hereda las del lugar asociado.
+    sync_coordinates(event)
+    if event.latitude is None and event.place_id:
+        place = db.get(Place, event.place_id)
+        if place:
+            event.latitude, event.longitude = place.latitude, place.longitude
+
+
+def _nearby(query, model, lat, lng, radius_m, min_lat, min_lng, max_lat, max_lng):
+    """Restricts ``query`` to a radius around (lat, lng) or to a bounding box."""
+    bbox = (min_lat, min_lng, max_lat, max_lng)
+    if lat is not None and lng is not None:
+        distance = distance_m(model, lat, lng)
+        return (
+            query.where(within_bbox(model, *radius_bbox(lat, lng, radius_m)))
+            .where(distance <= radius_m)
+            .order_by(distance)
+        )
+    if all(value is not None for value in bbox):
+        if min_lat > max_lat or min_lng > max_lng:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="invalid bounding box")
+        return query.where(within_bbox(model, *bbox))
+    raise HTTPException(
+        status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail="lat and lng or a bounding box required"
+    )
+
+
 @router.get("/catalog")
 def map_catalog():
     return {
@@ -50,22 +85,73 @@ def map_catalog():
 
 
 @router.get("/", response_model=List[PlaceOut])
-def list_places(
+async def list_places(
+    response: Response,
     category: Optional[str] = None,
     kind: Optional[str] = None,
     include_inactive: bool = Query(False),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     limit: int = Query(50, ge=1, le=200),
     offset: int = Query(0, ge=0),
+    cursor: Optional[str] = None,
 ) -> List[PlaceOut]:
-    query = db.query(Place).filter(Place.is_public.is_(True)).order_by(Place.created_at.desc())
+    query = select(Place).where(Place.is_public.is_(True))
     if not include_inactive:
-        query = query.filter(Place.status == "active")
+        query = query.where(Place.status == "active")
     if category:
-        query = query.filter(Place.category == category)
+        query = query.where(Place.category == category)
     if kind:
-        query = query.filter(Place.kind == kind)
-    return query.offset(offset).limit(limit).all()
+        query = query.where(Place.kind == kind)
+    result = await db.execute(place_keyset.apply(query, cursor, limit, offset))
+    return place_keyset.page(result.scalars().all(), limit, response)
+
+
+@router.get("/nearby", response_model=List[PlaceOut])
+async def nearby_places(
+    lat: Optional[float] = Query(None, ge=-90, le=90),
+    lng: Optional[float] = Query(None, ge=-180, le=180),
+    radius_m: float = Query(500, gt=0, le=20000),
+    min_lat: Optional[float] = Query(None, ge=-90, le=90),
+    min_lng: Optional[float] = Query(None, ge=-180, le=180),
+    max_lat: Optional[float] = Query(None, ge=-90, le=90),
+    max_lng: Optional[float] = Query(None, ge=-180, le=180),
+    category: Optional[str] = None,
+    kind: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=500),
+    db: AsyncSession = Depends(get_async_db),
+) -> List[PlaceOut]:
+    query = select(Place).where(Place.is_public.is_(True), Place.status == "active")
+    if category:
+        query = query.where(Place.category == category)
+    if kind:
+        query = query.where(Place.kind == kind)
+    query = _nearby(query, Place, lat, lng, radius_m, min_lat, min_lng, max_lat, max_lng)
+    result = await db.execute(query.limit(limit))
+    return result.scalars().all()
+
+
+@router.get("/events/nearby", response_model=List[MapEventOut])
+async def nearby_events(
+    lat: Optional[float] = Query(None, ge=-90, le=90),
+    lng: Optional[float] = Query(None, ge=-180, le=180),
+    radius_m: float = Query(500, gt=0, le=20000),
+    min_lat: Optional[float] = Query(None, ge=-90, le=90),
+    min_lng: Optional[float] = Query(None, ge=-180, le=180),
+    max_lat: Optional[float] = Query(None, ge=-90, le=90),
+    max_lng: Optional[float] = Query(None, ge=-180, le=180),
+    category: Optional[str] = None,
+    include_expired: bool = False,
+    limit: int = Query(100, ge=1, le=500),
+    db: AsyncSession = Depends(get_async_db),
+) -> List[MapEventOut]:
+    query = select(MapEvent)
+    if category:
+        query = query.where(MapEvent.category == category)
+    if not include_expired:
+        query = query.where(MapEvent.end_at >= datetime.utcnow())
+    query = _nearby(query, MapEvent, lat, lng, radius_m, min_lat, min_lng, max_lat, max_lng)
+    result = await db.execute(query.limit(limit))
+    return result.scalars().all()
 
 
 @router.post("/", response_model=PlaceOut, status_code=status.HTTP_201_CREATED)
@@ -75,6 +161,7 @@ def create_place(
     db: Session = Depends(get_db),
 ) -> PlaceOut:
     place = Place(owner_id=user["sub"], **body.model_dump())
+    sync_coordinates(place)
     db.add(place)
     db.commit()
     db.refresh(place)
@@ -95,6 +182,8 @@ def update_place(
     update_data = body.model_dump(exclude_unset=True)
     for key, value in update_data.items():
         setattr(place, key, value)
+    if "location" in update_data:
+        sync_coordinates(place)
     db.commit()
     db.refresh(place)
     return place
@@ -167,18 +256,20 @@ def list_products(place_id: UUID, db: Session = Depends(get_db)) -> List[PlacePr
 
 @router.get("/events", response_model=List[MapEventOut])
 def list_events(
+    response: Response,
     category: Optional[str] = None,
     include_expired: bool = False,
     db: Session = Depends(get_db),
     limit: int = Query(100, ge=1, le=200),
     offset: int = Query(0, ge=0),
+    cursor: Optional[str] = None,
 ) -> List[MapEventOut]:
-    query = db.query(MapEvent).order_by(MapEvent.start_at.asc())
+    query = db.query(MapEvent)
     if category:
         query = query.filter(MapEvent.category == category)
     if not include_expired:
         query = query.filter(MapEvent.end_at >= datetime.utcnow())
-    return query.offset(offset).limit(limit).all()
+    return event_keyset.page(event_keyset.apply(query, cursor, limit, offset).all(), limit, response)
 
 
 @router.post("/events", response_model=MapEventOut, status_code=status.HTTP_201_CREATED)
@@ -194,6 +285,7 @@ def create_event(
         if not place:
             raise HTTPException(status_code=404, detail="place not found")
     event = MapEvent(owner_id=user["sub"], **body.model_dump())
+    _sync_event_coordinates(db, event)
     db.add(event)
     db.commit()
     db.refresh(event)
@@ -223,6 +315,8 @@ def update_event(
             raise HTTPException(status_code=400, detail="end_at must be after start_at")
     for key, value in update_data.items():
         setattr(event, key, value)
+    if {"location", "place_id"} & update_data.keys():
+        _sync_event_coordinates(db, event)
     db.commit()
     db.refresh(event)
     return event
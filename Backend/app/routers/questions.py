@@ -3,11 +3,11 @@ from datetime import datetime
 from typing import Dict, List, Optional
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 from sqlalchemy.orm import Session
 
 from app.core.deps import get_db, require_role
-from app.models.coins import CoinsLedger
+from app.core.pagination import Keyset, SortKey
 from app.models.group import Group, GroupMembership
 from app.models.question import Question, QuestionCredit, QuestionResponse, QuestionTarget
 from app.models.user import User
@@ -21,11 +21,17 @@ from app.schemas.questions import (
     QuestionResponseItem,
     QuestionTargetsUpdate,
 )
+from app.services.coins_service import record_coins
 
 router = APIRouter()
 require_any_user = require_role("student", "professor", "superuser", "communications")
 require_prof_or_super = require_role("professor", "superuser")
 
+question_keyset = Keyset(SortKey(Question.created_at, descending=True), SortKey(Question.id, descending=True))
+response_keyset = Keyset(
+    SortKey(QuestionResponse.created_at, descending=True), SortKey(QuestionResponse.id, descending=True)
+)
+
 
 def _ensure_professor_access(question: Question, user: dict) -> None:
     if user["role"] == "professor" and str(question.created_by) != user["sub"]:
@@ -92,15 +98,17 @@ def get_credits(user=Depends(require_any_user), db: Session = Depends(get_db)) -
 
 @router.get("/", response_model=List[QuestionOut])
 def list_questions(
+    response: Response,
     category: Optional[str] = None,
     group_id: Optional[UUID] = None,
     only_global: bool = False,
     limit: int = Query(20, ge=1, le=200),
     offset: int = Query(0, ge=0),
+    cursor: Optional[str] = None,
     user=Depends(require_any_user),
     db: Session = Depends(get_db),
 ) -> List[QuestionOut]:
-    query = db.query(Question).filter(Question.active.is_(True)).order_by(Question.created_at.desc())
+    query = db.query(Question).filter(Question.active.is_(True))
     if category:
         query = query.filter(Question.category == category)
 
@@ -128,8 +136,8 @@ def list_questions(
             query.join(QuestionTarget, QuestionTarget.question_id == Question.id)
             .filter(QuestionTarget.group_id.in_(member_query))
         )
-    rows = query.distinct().offset(offset).limit(limit).all()
-    return _serialize_questions(db, rows)
+    rows = question_keyset.apply(query.distinct(), cursor, limit, offset).all()
+    return _serialize_questions(db, question_keyset.page(rows, limit, response))
 
 
 def _serialize_responses(
@@ -159,10 +167,12 @@ def _serialize_responses(
 
 @router.get("/responses", response_model=List[QuestionResponseItem])
 def list_question_responses(
+    response: Response,
     group_id: Optional[UUID] = None,
     question_id: Optional[UUID] = None,
     limit: int = Query(50, ge=1, le=200),
     offset: int = Query(0, ge=0),
+    cursor: Optional[str] = None,
     user=Depends(require_prof_or_super),
     db: Session = Depends(get_db),
 ) -> List[QuestionResponseItem]:
@@ -180,12 +190,8 @@ def list_question_responses(
             query.join(QuestionTarget, QuestionTarget.question_id == Question.id)
             .filter(QuestionTarget.group_id == group_id)
         )
-    rows = (
-        query.order_by(QuestionResponse.created_at.desc())
-        .offset(offset)
-        .limit(limit)
-        .all()
-    )
+    rows = response_keyset.apply(query, cursor, limit, offset).all()
+    rows = response_keyset.page(rows, limit, response, key_of=lambda row: row[0])
     return _serialize_responses(db, rows)
 
 
@@ -273,13 +279,13 @@ def answer_question(
     db.add(response)
 
     if coins_awarded > 0:
-        ledger_entry = CoinsLedger(
+        record_coins(
+            db,
             user_id=user["sub"],
             delta=coins_awarded,
             reason="Question reward",
             activity_id=None,
         )
-        db.add(ledger_entry)
 
     db.commit()
 
@@ -0,0 +1,91 @@
+from typing import List, Optional
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.deps import get_async_db, require_role
+from app.schemas.search import SearchHit, SearchResults
+
+router = APIRouter()
+require_any_user = require_role("student", "professor", "superuser", "communications", "market_manager")
+
+# Cada tipo aporta un SELECT sobre su columna tsvector generada; el filtro
+# por rol de preguntas replica el de GET /questions/.
+_NEWS = """
+    SELECT 'news' AS type, n.id, n.title, n.body AS content, ts_rank_cd(n.search_vector, q.query) AS rank
+    FROM news_articles n, q
+    WHERE n.search_vector @@ q.query AND n.published IS true
+"""
+_QUESTIONS = """
+    SELECT 'questions' AS type, x.id, x.title, x.body AS content, ts_rank_cd(x.search_vector, q.query) AS rank
+    FROM questions x, q
+    WHERE x.search_vector @@ q.query AND x.active IS true {role_filter}
+"""
+_PLACES = """
+    SELECT 'places' AS type, p.id, p.name AS title, p.description AS content,
+           ts_rank_cd(p.search_vector, q.query) AS rank
+    FROM places p, q
+    WHERE p.search_vector @@ q.query AND p.is_public IS true AND p.status = 'active'
+"""
+_STUDENT_QUESTIONS = """
+    AND EXISTS (
+        SELECT 1 FROM question_targets t
+        JOIN group_membership m ON m.group_id = t.group_id
+        WHERE t.question_id = x.id AND m.user_id = :uid
+    )
+"""
+SEARCH_TYPES = ("news", "questions", "places")
+
+
+def _search_sql(types: List[str], role: str) -> str:
+    parts = []
+    if "news" in types:
+        parts.append(_NEWS)
+    if "questions" in types:
+        role_filter = ""
+        if role == "professor":
+            role_filter = "AND x.created_by = :uid"
+        elif role == "student":
+            role_filter = _STUDENT_QUESTIONS
+        parts.append(_QUESTIONS.format(role_filter=role_filter))
+    if "places" in types:
+        parts.append(_PLACES)
+    # ts_headline solo se calcula para las filas que sobreviven al LIMIT.
+    return f"""
+        WITH q AS (SELECT websearch_to_tsquery('spanish', :q) AS query)
+        SELECT hits.type, hits.id, hits.title, hits.rank,
+               ts_headline('spanish', coalesce(hits.content, ''), q.query,
+                           'MaxFragments=1, MaxWords=25, MinWords=8') AS snippet
+        FROM ({" UNION ALL ".join(parts)} ORDER BY rank DESC LIMIT :limit) hits, q
+        ORDER BY hits.rank DESC
+    """
+
+
+@router.get("/", response_model=SearchResults)
+async def search(
+    q: str = Query(..., min_length=2, max_length=200),
+    types: Optional[List[str]] = Query(None, alias="type"),
+    limit: int = Query(20, ge=1, le=50),
+    user=Depends(require_any_user),
+    db: AsyncSession = Depends(get_async_db),
+) -> SearchResults:
+    selected = list(dict.fromkeys(types or SEARCH_TYPES))
+    unknown = [t for t in selected if t not in SEARCH_TYPES]
+    if unknown:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=f"unknown type: {unknown[0]}")
+    if user["role"] == "market_manager":
+        selected = [t for t in selected if t != "questions"]
+    if not selected:
+        return SearchResults(query=q, total=0, results=[])
+
+    params = {"q": q.strip(), "limit": limit}
+    if "questions" in selected and user["role"] in {"professor", "student"}:
+        params["uid"] = UUID(user["sub"])
+    result = await db.execute(text(_search_sql(selected, user["role"])), params)
+    hits = [
+        SearchHit(type=row.type, id=row.id, title=row.title, snippet=row.snippet, rank=row.rank)
+        for row in result
+    ]
+    return SearchResults(query=q, total=len(hits), results=hits)
@@ -1,39 +1,34 @@
+from uuid import UUID
+
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy import func
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from app.core.deps import get_db, require_role, require_superuser
+from app.core.deps import get_async_db, get_db, require_role, require_superuser
 from app.core.security import hash_password
-from app.models.coins import CoinsLedger
 from app.models.question import QuestionCredit, QuestionResponse
 from app.models.user import User
 from app.schemas.user import UserCreate, UserOut, UserUpdate
+from app.services.coins_service import get_balance_async
 
 router = APIRouter()
 require_any_user = require_role("student", "professor", "superuser", "communications", "market_manager")
 
 
 @router.get("/me", response_model=UserOut)
-def get_current_user(user=Depends(require_any_user), db: Session = Depends(get_db)) -> UserOut:
-    current = db.get(User, user["sub"])
+async def get_current_user(user=Depends(require_any_user), db: AsyncSession = Depends(get_async_db)) -> UserOut:
+    current = await db.get(User, UUID(user["sub"]))
     if not current:
         raise HTTPException(status_code=404, detail="user not found")
 
-    coins_balance = (
-        db.query(func.coalesce(func.sum(CoinsLedger.delta), 0))
-        .filter(CoinsLedger.user_id == current.id)
-        .scalar()
-        or 0
-    )
+    coins_balance, _ = await get_balance_async(db, current.id)
     question_credits = (
-        db.query(QuestionCredit.balance).filter(QuestionCredit.user_id == current.id).scalar() or 0
-    )
+        await db.execute(select(QuestionCredit.balance).where(QuestionCredit.user_id == current.id))
+    ).scalar() or 0
     questions_answered = (
-        db.query(func.count(QuestionResponse.id))
-        .filter(QuestionResponse.user_id == current.id)
-        .scalar()
-        or 0
-    )
+        await db.execute(select(func.count(QuestionResponse.id)).where(QuestionResponse.user_id == current.id))
+    ).scalar() or 0
     total_xp = coins_balance + questions_answered * 10
     level = max(1, (total_xp // 100) + 1)
     xp_in_level = total_xp % 100
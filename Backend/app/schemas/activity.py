@@ -1,8 +1,8 @@
 from datetime import datetime
-from typing import Any, List, Optional
+from typing import Any, List, Literal, Optional
 from uuid import UUID
 
-from pydantic import BaseModel, ConfigDict, EmailStr
+from pydantic import BaseModel, ConfigDict, EmailStr, Field
 
 class ActivityCreate(BaseModel):
     title: str
@@ -59,3 +59,21 @@ class ActivityDetailOut(ActivityOut):
     q_correct: Optional[List[int]] = None
     target_groups: List[ActivityTargetOut]
     submissions: List[ActivitySubmissionOut]
+
+
+class GradeIn(BaseModel):
+    submission_id: UUID
+    status: Literal["submitted", "approved", "rejected"]
+    score: Optional[int] = None
+    coins: int = Field(0, ge=0)
+
+
+class BulkGradeIn(BaseModel):
+    grades: List[GradeIn] = Field(..., min_length=1, max_length=1000)
+
+
+class BulkGradeOut(BaseModel):
+    activity_id: UUID
+    updated: int
+    missing: List[UUID]
+    coins_delta: int
@@ -47,3 +47,22 @@ class InviteCreate(BaseModel):
 
 class JoinByCode(BaseModel):
     code: str
+
+
+class BulkEnrollIn(BaseModel):
+    emails: list[EmailStr] = Field(..., min_length=1, max_length=5000)
+    invite_code: Optional[str] = None
+
+
+class BulkEnrollRow(BaseModel):
+    email: str
+    status: str  # enrolled | already_member | invite_full | not_found | not_student | duplicate | invalid_email
+    user_id: Optional[UUID] = None
+
+
+class BulkEnrollOut(BaseModel):
+    group_id: UUID
+    enrolled: int
+    already_member: int
+    rejected: int
+    rows: list[BulkEnrollRow]
@@ -39,6 +39,8 @@ class PlaceOut(BaseModel):
     thumbnail_url: Optional[str]
     hero_image_url: Optional[str]
     location: Optional[dict]
+    latitude: Optional[float] = None
+    longitude: Optional[float] = None
     contact: Optional[dict]
     tags: Optional[list]
     is_public: bool
@@ -115,6 +117,8 @@ class MapEventOut(BaseModel):
     start_at: datetime
     end_at: datetime
     location: Optional[dict]
+    latitude: Optional[float] = None
+    longitude: Optional[float] = None
     contact: Optional[dict]
     banner_url: Optional[str]
     visibility: str
@@ -0,0 +1,18 @@
+from typing import List, Optional
+from uuid import UUID
+
+from pydantic import BaseModel
+
+
+class SearchHit(BaseModel):
+    type: str
+    id: UUID
+    title: str
+    snippet: Optional[str] = None
+    rank: float
+
+
+class SearchResults(BaseModel):
+    query: str
+    total: int
+    results: List[SearchHit]
@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Iterable
+from uuid import UUID
+
+from sqlalchemy import func, select, text
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app.models.activity import ActivityTarget
+from app.models.analytics import GroupActivityStats
+from app.models.group import Group, GroupMembership
+from app.models.submission import Submission
+
+COUNTERS = ("member_count", "activity_count", "submission_count", "correct_count", "responded_count")
+
+
+def bump_group_stats(db: Session, group_ids: Iterable[UUID | str], **deltas: int) -> None:
+    """Adds ``deltas`` to the rollup counters of each group, creating missing rows."""
+    unknown = set(deltas) - set(COUNTERS)
+    if unknown:
+        raise ValueError(f"unknown counters: {sorted(unknown)}")
+    group_ids = list(dict.fromkeys(group_ids))
+    if not group_ids or not any(deltas.values()):
+        return
+    now = datetime.utcnow()
+    stmt = insert(GroupActivityStats).values(
+        [{"group_id": gid, "updated_at": now, **{name: deltas.get(name, 0) for name in COUNTERS}} for gid in group_ids]
+    )
+    set_ = {name: getattr(GroupActivityStats, name) + getattr(stmt.excluded, name) for name in deltas}
+    set_["updated_at"] = stmt.excluded.updated_at
+    db.execute(stmt.on_conflict_do_update(index_elements=[GroupActivityStats.group_id], set_=set_))
+
+
+def drop_group_stats(db: Session, group_id: UUID | str) -> None:
+    db.query(GroupActivityStats).filter(GroupActivityStats.group_id == group_id).delete(synchronize_session=False)
+
+
+def rebuild_group_stats(db: Session) -> int:
+    """Recomputes the rollup from the raw tables. The caller commits."""
+    db.execute(text("LOCK TABLE group_activity_stats IN SHARE ROW EXCLUSIVE MODE"))
+    db.execute(GroupActivityStats.__table__.delete())
+
+    members = (
+        select(
+            GroupMembership.group_id.label("group_id"),
+            func.count(func.distinct(GroupMembership.user_id)).label("members"),
+        )
+        .group_by(GroupMembership.group_id)
+        .subquery()
+    )
+    activities = (
+        select(
+            ActivityTarget.group_id.label("group_id"),
+            func.count(func.distinct(ActivityTarget.activity_id)).label("activities"),
+        )
+        .group_by(ActivityTarget.group_id)
+        .subquery()
+    )
+    submissions = (
+        select(
+            ActivityTarget.group_id.label("group_id"),
+            func.count(Submission.id).label("submissions"),
+            func.count(Submission.id).filter(Submission.is_correct.is_(True)).label("correct"),
+            func.count(func.distinct(Submission.user_id)).label("responded"),
+        )
+        .join(Submission, Submission.activity_id == ActivityTarget.activity_id)
+        .group_by(ActivityTarget.group_id)
+        .subquery()
+    )
+    rows = (
+        select(
+            Group.id,
+            func.coalesce(members.c.members, 0),
+            func.coalesce(activities.c.activities, 0),
+            func.coalesce(submissions.c.submissions, 0),
+            func.coalesce(submissions.c.correct, 0),
+            func.coalesce(submissions.c.responded, 0),
+            func.now(),
+        )
+        .outerjoin(members, members.c.group_id == Group.id)
+        .outerjoin(activities, activities.c.group_id == Group.id)
+        .outerjoin(submissions, submissions.c.group_id == Group.id)
+    )
+    result = db.execute(
+        insert(GroupActivityStats).from_select(["group_id", *COUNTERS, "updated_at"], rows)
+    )
+    return result.rowcount or 0
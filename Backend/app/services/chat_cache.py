@@ -0,0 +1,117 @@
+"""Optional cache of Chat Go replies to first messages.
+
+Only single-turn prompts are cached. Keys combine the normalized prompt
+with ``DEFAULT_POLICY.version``, so a policy change invalidates every
+entry. ``CHAT_CACHE_BACKEND`` selects the in-process LRU ("memory") or a
+shared backend given as ``"package.module:Class"``; that class is
+instantiated without arguments and must implement ``ReplyCacheBackend``.
+"""
+from __future__ import annotations
+
+import hashlib
+import importlib
+import re
+import threading
+import time
+import unicodedata
+from abc import ABC, abstractmethod
+
+from app.core.cache import LRUCache
+from app.core.config import settings
+from app.services.chat_policy import DEFAULT_POLICY
+
+
+class ReplyCacheBackend(ABC):
+    @abstractmethod
+    def get(self, key: str) -> str | None:
+        ...
+
+    @abstractmethod
+    def set(self, key: str, value: str, ttl_seconds: int) -> None:
+        ...
+
+    @abstractmethod
+    def clear(self) -> None:
+        ...
+
+
+class InMemoryReplyCache(ReplyCacheBackend):
+    def __init__(self, max_entries: int):
+        self._cache = LRUCache(max_entries)
+
+    def get(self, key: str) -> str | None:
+        return self._cache.get(key)
+
+    def set(self, key: str, value: str, ttl_seconds: int) -> None:
+        self._cache.set(key, value, expires_at=time.time() + ttl_seconds)
+
+    def clear(self) -> None:
+        self._cache.clear()
+
+
+def normalize_prompt(text: str) -> str:
+    text = unicodedata.normalize("NFKD", text.lower())
+    text = "".join(ch for ch in text if not unicodedata.combining(ch))
+    text = re.sub(r"\s+", " ", text)
+    return text.strip(" ¿?¡!.,;:")
+
+
+def cache_key(prompt: str) -> str:
+    raw = f"{DEFAULT_POLICY.version}\x00{normalize_prompt(prompt)}"
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class ReplyCache:
+    def __init__(self, backend: ReplyCacheBackend, ttl_seconds: int):
+        self.backend = backend
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def lookup(self, prompt: str) -> str | None:
+        value = self.backend.get(cache_key(prompt))
+        with self._lock:
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return value
+
+    def store(self, prompt: str, reply: str) -> None:
+        if reply:
+            self.backend.set(cache_key(prompt), reply, self.ttl_seconds)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "backend": type(self.backend).__name__,
+            "policy_version": DEFAULT_POLICY.version,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+def _load_backend(spec: str) -> ReplyCacheBackend:
+    if spec == "memory":
+        return InMemoryReplyCache(settings.CHAT_CACHE_MAX_ENTRIES)
+    module_name, _, class_name = spec.partition(":")
+    backend_cls = getattr(importlib.import_module(module_name), class_name)
+    return backend_cls()
+
+
+_reply_cache: ReplyCache | None = None
+_reply_cache_lock = threading.Lock()
+
+
+def get_reply_cache() -> ReplyCache | None:
+    global _reply_cache
+    if not settings.CHAT_CACHE_ENABLED:
+        return None
+    if _reply_cache is None:
+        # Dos hilos no deben construir cada uno su propio backend.
+        with _reply_cache_lock:
+            if _reply_cache is None:
+                _reply_cache = ReplyCache(_load_backend(settings.CHAT_CACHE_BACKEND), settings.CHAT_CACHE_TTL_SECONDS)
+    return _reply_cache
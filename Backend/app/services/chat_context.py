@@ -0,0 +1,103 @@
+"""Token-budgeted prompt context for Chat Go sessions.
+
+Only the tail of ``chat_messages`` is read: the last
+``CHAT_CONTEXT_TURNS`` turns go to the model verbatim, and the oldest
+unsummarized turns are folded into ``ChatSession.summary`` in batches of
+``CHAT_SUMMARY_BATCH`` messages, one batch per reply.
+``summarized_until`` marks the newest message already folded.
+"""
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, List
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.chats import ChatMessage, ChatSession
+from app.services.chat_service import summarize_history
+
+logger = logging.getLogger(__name__)
+
+
+def estimate_tokens(text: str) -> int:
+    # Aproximación de ~4 caracteres por token; suficiente para acotar el prompt.
+    return len(text) // 4 + 1
+
+
+@dataclass
+class ChatContext:
+    summary: str | None
+    recent: List[Dict[str, str]]
+    to_fold: List[Dict[str, str]] = field(default_factory=list)
+    fold_until: datetime | None = None
+    summary_changed: bool = False
+
+    def messages(self) -> List[Dict[str, str]]:
+        """History to send to the model, trimmed from the oldest end to the token budget."""
+        prefix: List[Dict[str, str]] = []
+        if self.summary:
+            prefix.append({"role": "system", "content": f"Resumen de la conversación anterior:\n{self.summary}"})
+        turns = list(self.to_fold) + list(self.recent)
+        budget = settings.CHAT_CONTEXT_MAX_TOKENS - sum(estimate_tokens(m["content"]) for m in prefix)
+        used = sum(estimate_tokens(m["content"]) for m in turns)
+        while len(turns) > 1 and used > budget:
+            used -= estimate_tokens(turns.pop(0)["content"])
+        return prefix + turns
+
+    def is_single_turn(self) -> bool:
+        return not self.summary and not self.to_fold and len(self.recent) == 1
+
+
+def build_context(db: Session, session: ChatSession) -> ChatContext:
+    keep = max(settings.CHAT_CONTEXT_TURNS, 1) * 2
+    batch = max(settings.CHAT_SUMMARY_BATCH, 1)
+    query = db.query(ChatMessage.role, ChatMessage.content, ChatMessage.created_at).filter(
+        ChatMessage.session_id == session.id
+    )
+    if session.summarized_until is not None:
+        query = query.filter(ChatMessage.created_at > session.summarized_until)
+
+    tail = list(reversed(query.order_by(ChatMessage.created_at.desc()).limit(keep).all()))
+    context = ChatContext(
+        summary=session.summary,
+        recent=[{"role": row.role, "content": row.content} for row in tail],
+    )
+    if not tail:
+        return context
+
+    # Se pliegan los mensajes sin resumir más antiguos, no los que quedan justo
+    # antes de la cola: así summarized_until solo avanza sobre lo resumido y
+    # un atraso (sesiones previas o un resumen fallido) se recupera por lotes.
+    older = (
+        query.filter(ChatMessage.created_at < tail[0].created_at)
+        .order_by(ChatMessage.created_at.asc())
+        .limit(batch)
+        .all()
+    )
+    if len(older) >= batch:
+        context.to_fold = [{"role": row.role, "content": row.content} for row in older]
+        context.fold_until = older[-1].created_at
+    else:
+        context.recent = [{"role": row.role, "content": row.content} for row in older] + context.recent
+    return context
+
+
+def refresh_summary(context: ChatContext) -> None:
+    """Folds ``to_fold`` into the summary. Calls the model, so run it without a DB connection held."""
+    if not context.to_fold:
+        return
+    try:
+        context.summary = summarize_history(context.summary, context.to_fold)
+    except Exception:
+        logger.warning("chat summary refresh failed", exc_info=True)
+        return
+    context.summary_changed = True
+
+
+def apply_summary(session: ChatSession, context: ChatContext) -> None:
+    if context.summary_changed:
+        session.summary = context.summary
+        session.summarized_until = context.fold_until
@@ -1,15 +1,20 @@
 from __future__ import annotations
 
-from typing import List, Dict
+from typing import AsyncIterator, List, Dict
 
 import httpx
-from openai import OpenAI
+from openai import AsyncOpenAI, OpenAI
 
 from app.core.config import settings
+from app.services import fake_llm
 from app.services.chat_policy import DEFAULT_POLICY
 
+CHAT_MODEL = "gpt-4o-mini"
+
 _client: OpenAI | None = None
 _httpx_client: httpx.Client | None = None
+_async_client: AsyncOpenAI | None = None
+_async_httpx_client: httpx.AsyncClient | None = None
 
 
 def get_client() -> OpenAI:
@@ -22,14 +27,75 @@ def get_client() -> OpenAI:
     return _client
 
 
-def generate_ai_reply(history: List[Dict[str, str]]) -> str:
-    messages = [
+def get_async_client() -> AsyncOpenAI:
+    global _async_client, _async_httpx_client
+    if _async_client is None:
+        if not settings.OPENAI_API_KEY:
+            raise RuntimeError("OPENAI_API_KEY is not configured")
+        _async_httpx_client = httpx.AsyncClient(timeout=30)
+        _async_client = AsyncOpenAI(api_key=settings.OPENAI_API_KEY, http_client=_async_httpx_client)
+    return _async_client
+
+
+def _build_messages(history: List[Dict[str, str]]) -> List[Dict[str, str]]:
+    return [
         {"role": "system", "content": DEFAULT_POLICY.system_prompt}
     ] + history
+
+
+def generate_ai_reply(history: List[Dict[str, str]]) -> str:
+    messages = _build_messages(history)
+    if settings.CHAT_LLM_BACKEND == "fake":
+        return fake_llm.complete(messages)
     client = get_client()
     response = client.chat.completions.create(
-        model="gpt-4o-mini",
+        model=CHAT_MODEL,
         messages=messages,
         temperature=0.6,
     )
     return response.choices[0].message.content or ""
+
+
+def summarize_history(previous_summary: str | None, history: List[Dict[str, str]]) -> str:
+    transcript = "\n".join(f"{msg['role']}: {msg['content']}" for msg in history)
+    messages = [
+        {
+            "role": "system",
+            "content": (
+                "Resume la conversación entre un estudiante y Chat Go en máximo 120 palabras."
+                " Conserva datos, preguntas abiertas y acuerdos; omite saludos."
+            ),
+        },
+        {
+            "role": "user",
+            "content": f"Resumen previo:\n{previous_summary or '(ninguno)'}\n\nNuevos mensajes:\n{transcript}",
+        },
+    ]
+    if settings.CHAT_LLM_BACKEND == "fake":
+        return fake_llm.summarize(previous_summary, history)
+    client = get_client()
+    response = client.chat.completions.create(
+        model=CHAT_MODEL,
+        messages=messages,
+        temperature=0.2,
+        max_tokens=240,
+    )
+    return response.choices[0].message.content or previous_summary or ""
+
+
+async def stream_ai_reply(history: List[Dict[str, str]]) -> AsyncIterator[str]:
+    messages = _build_messages(history)
+    if settings.CHAT_LLM_BACKEND == "fake":
+        async for token in fake_llm.stream(messages):
+            yield token
+        return
+    client = get_async_client()
+    stream = await client.chat.completions.create(
+        model=CHAT_MODEL,
+        messages=messages,
+        temperature=0.6,
+        stream=True,
+    )
+    async for chunk in stream:
+        if chunk.choices and chunk.choices[0].delta.content:
+            yield chunk.choices[0].delta.content
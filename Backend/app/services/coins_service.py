@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+from collections import defaultdict
+from datetime import datetime
+from typing import Iterable
+from uuid import UUID, uuid4
+
+from sqlalchemy import func, select, text
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.models.coins import CoinsBalance, CoinsLedger
+
+
+def _apply_delta(db: Session, user_id: UUID | str, delta: int, at: datetime) -> None:
+    stmt = insert(CoinsBalance).values(user_id=user_id, balance=delta, updated_at=at)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[CoinsBalance.user_id],
+        set_={
+            "balance": CoinsBalance.balance + stmt.excluded.balance,
+            "updated_at": stmt.excluded.updated_at,
+        },
+    )
+    db.execute(stmt)
+
+
+def record_coins(
+    db: Session,
+    user_id: UUID | str,
+    delta: int,
+    reason: str,
+    activity_id: UUID | str | None = None,
+) -> CoinsLedger:
+    """Adds a ledger entry and moves the materialized balance in the same transaction."""
+    now = datetime.utcnow()
+    entry = CoinsLedger(
+        user_id=user_id,
+        delta=delta,
+        reason=reason,
+        activity_id=activity_id,
+        created_at=now,
+    )
+    db.add(entry)
+    _apply_delta(db, user_id, delta, now)
+    return entry
+
+
+def record_coins_bulk(
+    db: Session,
+    deltas: Iterable[tuple[UUID | str, int]],
+    reason: str,
+    activity_id: UUID | str | None = None,
+) -> int:
+    """Writes one ledger row per non-zero delta in a single INSERT and upserts each balance once."""
+    now = datetime.utcnow()
+    rows = [
+        {"id": uuid4(), "user_id": user_id, "delta": delta, "reason": reason, "activity_id": activity_id, "created_at": now}
+        for user_id, delta in deltas
+        if delta
+    ]
+    if not rows:
+        return 0
+    db.execute(insert(CoinsLedger).values(rows))
+
+    totals: dict[str, int] = defaultdict(int)
+    for row in rows:
+        totals[str(row["user_id"])] += row["delta"]
+    stmt = insert(CoinsBalance).values(
+        [{"user_id": user_id, "balance": total, "updated_at": now} for user_id, total in totals.items()]
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[CoinsBalance.user_id],
+        set_={
+            "balance": CoinsBalance.balance + stmt.excluded.balance,
+            "updated_at": stmt.excluded.updated_at,
+        },
+    )
+    db.execute(stmt)
+    return len(rows)
+
+
+def get_balance(db: Session, user_id: UUID | str, for_update: bool = False) -> tuple[int, datetime | None]:
+    """Reads the materialized balance. ``for_update`` locks the row until commit before a debit."""
+    stmt = select(CoinsBalance.balance, CoinsBalance.updated_at).where(CoinsBalance.user_id == user_id)
+    if for_update:
+        stmt = stmt.with_for_update()
+    row = db.execute(stmt).first()
+    if not row:
+        return 0, None
+    return row.balance or 0, row.updated_at
+
+
+async def get_balance_async(db: AsyncSession, user_id: UUID | str) -> tuple[int, datetime | None]:
+    row = (
+        await db.execute(
+            select(CoinsBalance.balance, CoinsBalance.updated_at).where(CoinsBalance.user_id == user_id)
+        )
+    ).first()
+    if not row:
+        return 0, None
+    return row.balance or 0, row.updated_at
+
+
+def rebuild_balances(db: Session) -> int:
+    """Recomputes every balance from coins_ledger. The caller commits."""
+    # Blocks concurrent balance upserts until the rebuild commits, so no delta is lost or counted twice.
+    db.execute(text("LOCK TABLE coins_balances IN SHARE ROW EXCLUSIVE MODE"))
+    db.execute(CoinsBalance.__table__.delete())
+    totals = select(
+        CoinsLedger.user_id,
+        func.sum(CoinsLedger.delta),
+        func.max(CoinsLedger.created_at),
+    ).group_by(CoinsLedger.user_id)
+    result = db.execute(
+        insert(CoinsBalance).from_select(["user_id", "balance", "updated_at"], totals)
+    )
+    return result.rowcount or 0
@@ -0,0 +1,198 @@
+"""Streaming exports of activity submissions.
+
+Rows come from a server-side cursor in ``EXPORT_BATCH_SIZE`` partitions and
+are encoded batch by batch, so memory stays bounded by one partition
+whatever the size of the export. Each generator opens (and closes) its own
+session because it outlives the request's dependencies.
+"""
+from __future__ import annotations
+
+import csv
+import io
+import json
+import zlib
+from typing import Iterator
+
+from sqlalchemy import Select, select
+
+from app.db.session import SessionLocal
+from app.models.activity import Activity
+from app.models.submission import Submission
+from app.models.user import User
+
+EXPORT_BATCH_SIZE = 1000
+
+COLUMNS = (
+    "submission_id",
+    "activity_id",
+    "activity_title",
+    "student_id",
+    "student_email",
+    "student_name",
+    "status",
+    "is_correct",
+    "score",
+    "awarded_coins",
+    "answer",
+    "submitted_at",
+    "updated_at",
+)
+
+
+def submissions_query() -> Select:
+    return (
+        select(
+            Submission.id,
+            Submission.activity_id,
+            Activity.title,
+            Submission.user_id,
+            User.email,
+            User.full_name,
+            Submission.status,
+            Submission.is_correct,
+            Submission.score,
+            Submission.awarded_coins,
+            Submission.answer,
+            Submission.created_at,
+            Submission.updated_at,
+        )
+        .join(Activity, Activity.id == Submission.activity_id)
+        .join(User, User.id == Submission.user_id)
+        .order_by(Submission.activity_id, Submission.created_at, Submission.id)
+    )
+
+
+def _partitions(stmt: Select) -> Iterator[list]:
+    db = SessionLocal()
+    try:
+        result = db.execute(stmt.execution_options(stream_results=True, yield_per=EXPORT_BATCH_SIZE))
+        for partition in result.partitions():
+            yield partition
+    finally:
+        db.close()
+
+
+def _csv_value(value):
+    if value is None:
+        return ""
+    if hasattr(value, "value"):  # enums
+        return value.value
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, ensure_ascii=False)
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    return value
+
+
+def _gzipped(chunks: Iterator[bytes]) -> Iterator[bytes]:
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)  # wbits=31: cabecera gzip
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def _csv_chunks(stmt: Select) -> Iterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(COLUMNS)
+    for partition in _partitions(stmt):
+        for row in partition:
+            writer.writerow([_csv_value(value) for value in row])
+        yield buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
+
+
+def iter_csv(stmt: Select, gzip: bool = False) -> Iterator[bytes]:
+    chunks = _csv_chunks(stmt)
+    return _gzipped(chunks) if gzip else chunks
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file object that hands written bytes back to the generator."""
+
+    def __init__(self):
+        self.chunks: list[bytes] = []
+        self.position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self.chunks.append(data)
+        self.position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self.position
+
+    def drain(self) -> bytes:
+        data, self.chunks = b"".join(self.chunks), []
+        return data
+
+
+def iter_parquet(stmt: Select, compression: str = "snappy") -> Iterator[bytes]:
+    """Requires pyarrow; callers should check ``parquet_available()`` first."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = pa.schema(
+        [
+            ("submission_id", pa.string()),
+            ("activity_id", pa.string()),
+            ("activity_title", pa.string()),
+            ("student_id", pa.string()),
+            ("student_email", pa.string()),
+            ("student_name", pa.string()),
+            ("status", pa.string()),
+            ("is_correct", pa.bool_()),
+            ("score", pa.int64()),
+            ("awarded_coins", pa.int64()),
+            ("answer", pa.string()),
+            ("submitted_at", pa.timestamp("us")),
+            ("updated_at", pa.timestamp("us")),
+        ]
+    )
+    sink = _ChunkSink()
+    writer = pq.ParquetWriter(sink, schema, compression=compression)
+    try:
+        for partition in _partitions(stmt):
+            columns = list(zip(*partition))
+            arrays = [
+                [str(v) if v is not None else None for v in columns[0]],
+                [str(v) if v is not None else None for v in columns[1]],
+                list(columns[2]),
+                [str(v) if v is not None else None for v in columns[3]],
+                list(columns[4]),
+                list(columns[5]),
+                [v.value if v is not None else None for v in columns[6]],
+                list(columns[7]),
+                list(columns[8]),
+                list(columns[9]),
+                [json.dumps(v, ensure_ascii=False) if v is not None else None for v in columns[10]],
+                list(columns[11]),
+                list(columns[12]),
+            ]
+            table = pa.Table.from_arrays(
+                [pa.array(values, type=field.type) for values, field in zip(arrays, schema)], schema=schema
+            )
+            writer.write_table(table)
+            data = sink.drain()
+            if data:
+                yield data
+    finally:
+        writer.close()
+    yield sink.drain()
+
+
+def parquet_available() -> bool:
+    try:
+        import pyarrow.parquet  # noqa: F401
+    except ImportError:
+        return False
+    return True
@@ -0,0 +1,43 @@
+"""Local stand-in for the chat model.
+
+Enabled with ``CHAT_LLM_BACKEND=fake``. It answers deterministically and
+sleeps like a remote model would, so load tests can measure time to first
+byte and worker occupancy without calling OpenAI.
+"""
+from __future__ import annotations
+
+import asyncio
+import re
+import time
+from typing import AsyncIterator, Dict, List
+
+from app.core.config import settings
+
+
+def _reply_for(messages: List[Dict[str, str]]) -> str:
+    last_user = next((m["content"] for m in reversed(messages) if m.get("role") == "user"), "")
+    return f"Respuesta de prueba de Chat Go a: {last_user}"
+
+
+def _tokens(text: str) -> List[str]:
+    return re.findall(r"\S+\s*", text) or [text]
+
+
+def complete(messages: List[Dict[str, str]]) -> str:
+    tokens = _tokens(_reply_for(messages))
+    delay_ms = settings.FAKE_LLM_FIRST_TOKEN_MS + settings.FAKE_LLM_TOKEN_DELAY_MS * len(tokens)
+    time.sleep(delay_ms / 1000)
+    return "".join(tokens)
+
+
+async def stream(messages: List[Dict[str, str]]) -> AsyncIterator[str]:
+    await asyncio.sleep(settings.FAKE_LLM_FIRST_TOKEN_MS / 1000)
+    for token in _tokens(_reply_for(messages)):
+        yield token
+        await asyncio.sleep(settings.FAKE_LLM_TOKEN_DELAY_MS / 1000)
+
+
+def summarize(previous_summary: str | None, messages: List[Dict[str, str]]) -> str:
+    lines = [previous_summary] if previous_summary else []
+    lines += [f"{m['role']}: {m['content'][:80]}" for m in messages]
+    return "\n".join(lines)[-1000:]
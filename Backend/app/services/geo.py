@@ -0,0 +1,70 @@
+"""Coordinates extracted from the free-form ``location`` JSON of places and events.
+
+Clients send ``{"lat": .., "lng": ..}`` (``lon``/``latitude``/``longitude``
+are accepted too) or a GeoJSON-style ``{"coordinates": [lng, lat]}``.
+Nearby queries filter with a bounding box on the GiST ``point(longitude,
+latitude)`` index and then refine with the haversine distance.
+"""
+from __future__ import annotations
+
+import math
+from typing import Optional, Tuple
+
+from sqlalchemy import func
+
+EARTH_RADIUS_M = 6_371_000.0
+
+_LAT_KEYS = ("lat", "latitude")
+_LNG_KEYS = ("lng", "lon", "longitude")
+
+
+def _number(value) -> Optional[float]:
+    if isinstance(value, bool):
+        return None
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return None
+    return number if math.isfinite(number) else None
+
+
+def extract_coordinates(location: Optional[dict]) -> Tuple[Optional[float], Optional[float]]:
+    if not isinstance(location, dict):
+        return None, None
+    lat = next((_number(location[k]) for k in _LAT_KEYS if k in location), None)
+    lng = next((_number(location[k]) for k in _LNG_KEYS if k in location), None)
+    coordinates = location.get("coordinates")
+    if (lat is None or lng is None) and isinstance(coordinates, (list, tuple)) and len(coordinates) >= 2:
+        lng, lat = _number(coordinates[0]), _number(coordinates[1])
+    if lat is None or lng is None or not (-90 <= lat <= 90 and -180 <= lng <= 180):
+        return None, None
+    return lat, lng
+
+
+def sync_coordinates(obj) -> None:
+    """Copies the coordinates in ``obj.location`` to its latitude/longitude columns."""
+    obj.latitude, obj.longitude = extract_coordinates(obj.location)
+
+
+def radius_bbox(lat: float, lng: float, radius_m: float) -> Tuple[float, float, float, float]:
+    """Returns (min_lat, min_lng, max_lat, max_lng) enclosing the circle."""
+    dlat = math.degrees(radius_m / EARTH_RADIUS_M)
+    cos_lat = max(math.cos(math.radians(lat)), 1e-6)
+    dlng = min(math.degrees(radius_m / (EARTH_RADIUS_M * cos_lat)), 180.0)
+    return max(lat - dlat, -90.0), max(lng - dlng, -180.0), min(lat + dlat, 90.0), min(lng + dlng, 180.0)
+
+
+def within_bbox(model, min_lat: float, min_lng: float, max_lat: float, max_lng: float):
+    # Misma expresión que el índice GiST para que el planner lo use.
+    return func.point(model.longitude, model.latitude).op("<@")(
+        func.box(func.point(min_lng, min_lat), func.point(max_lng, max_lat))
+    )
+
+
+def distance_m(model, lat: float, lng: float):
+    dlat = func.radians(model.latitude - lat) / 2
+    dlng = func.radians(model.longitude - lng) / 2
+    a = func.power(func.sin(dlat), 2) + func.cos(func.radians(lat)) * func.cos(
+        func.radians(model.latitude)
+    ) * func.power(func.sin(dlng), 2)
+    return 2 * EARTH_RADIUS_M * func.asin(func.sqrt(func.least(a, 1.0)))
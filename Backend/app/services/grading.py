@@ -0,0 +1,95 @@
+"""Cached grading specs for published activities.
+
+A ``GradingSpec`` is an immutable snapshot of what ``submit`` needs: the
+correct option list, the time window, the reward and the target groups.
+Specs are stamped with ``Activity.version``; the submission insert only
+succeeds while that version is current, so a worker holding a stale spec
+drops it and reloads instead of grading with an old key.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import datetime
+from typing import FrozenSet, Optional, Tuple
+from uuid import UUID
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app.core.cache import LRUCache
+from app.core.config import settings
+from app.models.activity import Activity, ActivityStatus, ActivityTarget, ActivityType
+
+spec_cache = LRUCache(settings.GRADING_SPEC_CACHE_SIZE, ttl_seconds=settings.GRADING_SPEC_CACHE_TTL_SECONDS)
+
+
+@dataclass(frozen=True)
+class GradingSpec:
+    activity_id: UUID
+    version: int
+    type: ActivityType
+    status: ActivityStatus
+    correct: Tuple[int, ...]
+    reward: int
+    start_at: Optional[datetime]
+    end_at: Optional[datetime]
+    target_group_ids: FrozenSet[UUID]
+
+    def grade(self, selected) -> tuple[Optional[bool], int]:
+        """Returns (is_correct, awarded coins); open activities are graded later.
+
+        Answers are compared as ordered lists, exactly like the uncached
+        grader did: a set comparison would also accept reordered or
+        duplicated selections and change which submissions earn coins.
+        """
+        if self.type != ActivityType.quiz_single:
+            return None, 0
+        is_correct = tuple(selected or ()) == self.correct
+        return is_correct, self.reward if is_correct else 0
+
+
+def load_spec(db: Session, activity_id: UUID) -> Optional[GradingSpec]:
+    row = db.execute(
+        select(
+            Activity.id,
+            Activity.version,
+            Activity.type,
+            Activity.status,
+            Activity.q_correct,
+            Activity.coins_on_complete,
+            Activity.start_at,
+            Activity.end_at,
+            func.array_agg(ActivityTarget.group_id),
+        )
+        .outerjoin(ActivityTarget, ActivityTarget.activity_id == Activity.id)
+        .where(Activity.id == activity_id)
+        .group_by(Activity.id)
+    ).first()
+    if row is None:
+        return None
+    aid, version, type_, status, correct, reward, start_at, end_at, group_ids = row
+    return GradingSpec(
+        activity_id=aid,
+        version=version,
+        type=type_,
+        status=status,
+        correct=tuple(correct or ()),
+        reward=reward or 0,
+        start_at=start_at,
+        end_at=end_at,
+        target_group_ids=frozenset(gid for gid in group_ids or () if gid is not None),
+    )
+
+
+def get_spec(db: Session, activity_id: UUID, refresh: bool = False) -> Optional[GradingSpec]:
+    spec = None if refresh else spec_cache.get(activity_id)
+    if spec is None:
+        spec = load_spec(db, activity_id)
+        # Solo se cachean publicadas: publicar sube la versión en otro worker.
+        if spec is not None and spec.status == ActivityStatus.published:
+            spec_cache.set(activity_id, spec)
+    return spec
+
+
+def invalidate_spec(activity_id: UUID) -> None:
+    spec_cache.pop(activity_id)
@@ -0,0 +1,71 @@
+"""Cached, pre-serialized first page of the public news feed.
+
+Entries are keyed by the ``news_feed`` row of ``cache_versions``, which every
+editor write and the scheduler bump (``invalidate_feed``). Each feed request
+reads that counter with a primary-key lookup, so every worker and the CLI
+see a write on the next request instead of when the TTL expires.
+"""
+from __future__ import annotations
+
+import hashlib
+from dataclasses import dataclass
+from datetime import datetime
+from typing import List, Optional, Sequence
+
+from pydantic import TypeAdapter
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.cache import LRUCache
+from app.core.config import settings
+from app.models.cache_version import CacheVersion
+from app.schemas.news import NewsOut
+
+FEED_VERSION_KEY = "news_feed"
+_news_list = TypeAdapter(List[NewsOut])
+
+feed_cache = LRUCache(settings.NEWS_FEED_CACHE_SIZE, ttl_seconds=settings.NEWS_FEED_CACHE_TTL_SECONDS)
+
+
+@dataclass(frozen=True)
+class FeedPage:
+    body: bytes
+    etag: str
+    next_cursor: Optional[str] = None
+
+
+async def current_version(db: AsyncSession) -> int:
+    version = await db.scalar(select(CacheVersion.version).where(CacheVersion.name == FEED_VERSION_KEY))
+    return version or 0
+
+
+def invalidate_feed(db: Session) -> None:
+    """Bumps the shared feed version and commits; call it after the write commits."""
+    now = datetime.utcnow()
+    stmt = insert(CacheVersion).values(name=FEED_VERSION_KEY, version=1, updated_at=now)
+    db.execute(
+        stmt.on_conflict_do_update(
+            index_elements=[CacheVersion.name],
+            set_={"version": CacheVersion.version + 1, "updated_at": stmt.excluded.updated_at},
+        )
+    )
+    db.commit()
+    # Las páginas con la versión anterior ya no se piden; liberar memoria.
+    feed_cache.clear()
+
+
+def render_page(rows: Sequence, next_cursor: Optional[str] = None) -> FeedPage:
+    body = _news_list.dump_json(list(rows))
+    return FeedPage(body=body, etag=f'"{hashlib.sha256(body).hexdigest()[:32]}"', next_cursor=next_cursor)
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # If-None-Match usa comparación débil: se ignora el prefijo W/.
+    candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return etag in candidates
@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from datetime import datetime
+from typing import List
+from uuid import UUID
+
+from sqlalchemy import text, update
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from app.db.session import SessionLocal
+from app.models.news import NewsArticle
+from app.services.news_feed import invalidate_feed
+
+logger = logging.getLogger("app.news")
+
+
+def publish_due_articles(db: Session, now: datetime | None = None) -> List[UUID]:
+    """Publishes unpublished articles whose ``publish_at`` has passed and commits.
+
+    The UPDATE is conditional, so several workers (or the CLI) can run it at
+    the same time without double-processing an article.
+    """
+    now = now or datetime.utcnow()
+    result = db.execute(
+        update(NewsArticle)
+        .where(
+            NewsArticle.published.isnot(True),
+            NewsArticle.publish_at.isnot(None),
+            NewsArticle.publish_at <= now,
+        )
+        .values(published=True, updated_at=now)
+        .returning(NewsArticle.id)
+        .execution_options(synchronize_session=False)
+    )
+    published = [row[0] for row in result]
+    db.commit()
+    if published:
+        invalidate_feed(db)
+    return published
+
+
+# Clave del advisory lock que serializa el programador entre workers.
+SCHEDULER_LOCK_KEY = 0x6E657773
+
+
+def _publish_due_once() -> int:
+    db = SessionLocal()
+    try:
+        # El lock de transacción se libera con el commit de publish_due_articles.
+        if not db.execute(text("SELECT pg_try_advisory_xact_lock(:key)"), {"key": SCHEDULER_LOCK_KEY}).scalar():
+            db.rollback()
+            return 0
+        return len(publish_due_articles(db))
+    finally:
+        db.close()
+
+
+async def run_scheduler(interval_seconds: float) -> None:
+    while True:
+        try:
+            count = await run_in_threadpool(_publish_due_once)
+            if count:
+                logger.info("published %d scheduled articles", count)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("scheduled news publishing failed")
+        await asyncio.sleep(interval_seconds)
@@ -0,0 +1,204 @@
+"""One-statement write path for activity submissions.
+
+``insert_submission`` checks that the grading spec version is still
+current and that the student belongs to a target group, inserts the
+submission (relying on ``uq_submission`` via ON CONFLICT DO NOTHING),
+writes the ledger row, moves the materialized balance and bumps the group
+rollups in a single round trip. The caller commits.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Sequence
+from uuid import UUID, uuid4
+
+from sqlalchemy import bindparam, text
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import Session
+
+from app.models.submission import SubmissionStatus
+from app.services.grading import GradingSpec
+
+# Contadores de group_activity_stats: el snapshot del CTE todavía no ve la
+# fila insertada, así que "responded" solo suma en la primera entrega.
+_SUBMIT = text(
+    """
+    WITH allowed AS (
+        SELECT
+            EXISTS (
+                SELECT 1 FROM activities
+                WHERE id = :aid AND version = :version AND status = 'published'
+            ) AS fresh,
+            EXISTS (
+                SELECT 1 FROM group_membership
+                WHERE user_id = :uid AND group_id = ANY(CAST(:gids AS uuid[]))
+            ) AS ok
+    ),
+    ins AS (
+        INSERT INTO submissions (id, activity_id, user_id, answer, is_correct, status, awarded_coins, created_at, updated_at)
+        SELECT :sid, :aid, :uid, :answer, :is_correct, CAST(:status AS submissionstatus), :awarded, :now, :now
+        WHERE (SELECT fresh AND ok FROM allowed)
+        ON CONFLICT ON CONSTRAINT uq_submission DO NOTHING
+        RETURNING id, awarded_coins
+    ),
+    ledger AS (
+        INSERT INTO coins_ledger (id, user_id, activity_id, delta, reason, created_at)
+        SELECT :lid, :uid, :aid, awarded_coins, :reason, :now FROM ins WHERE awarded_coins > 0
+        RETURNING delta
+    ),
+    balance AS (
+        INSERT INTO coins_balances (user_id, balance, updated_at)
+        SELECT :uid, delta, :now FROM ledger
+        ON CONFLICT (user_id) DO UPDATE
+        SET balance = coins_balances.balance + excluded.balance, updated_at = excluded.updated_at
+    ),
+    stats AS (
+        UPDATE group_activity_stats AS g
+        SET submission_count = g.submission_count + 1,
+            correct_count = g.correct_count + :correct,
+            responded_count = g.responded_count + CASE WHEN EXISTS (
+                SELECT 1
+                FROM submissions s
+                JOIN activity_targets t ON t.activity_id = s.activity_id
+                WHERE t.group_id = g.group_id AND s.user_id = :uid
+            ) THEN 0 ELSE 1 END,
+            updated_at = :now
+        WHERE g.group_id = ANY(CAST(:gids AS uuid[]))
+          AND EXISTS (SELECT 1 FROM ins)
+    )
+    SELECT fresh, ok AS allowed, (SELECT id FROM ins) AS submission_id FROM allowed
+    """
+).bindparams(bindparam("answer", type_=JSONB))
+
+
+@dataclass(frozen=True)
+class SubmissionResult:
+    fresh: bool
+    allowed: bool
+    submission_id: UUID | None
+
+
+def insert_submission(
+    db: Session,
+    spec: GradingSpec,
+    user_id: UUID | str,
+    answer: Any,
+    is_correct: bool | None,
+    status: SubmissionStatus,
+    awarded_coins: int,
+    reason: str = "Activity completion (auto)",
+) -> SubmissionResult:
+    """``submission_id`` is None when nothing was written.
+
+    ``fresh`` is False when ``spec`` is outdated (the activity was published
+    again since it was loaded); the caller should reload it and retry.
+    """
+    row = db.execute(
+        _SUBMIT,
+        {
+            "aid": str(spec.activity_id),
+            "version": spec.version,
+            "gids": [str(gid) for gid in spec.target_group_ids],
+            "uid": str(user_id),
+            "sid": str(uuid4()),
+            "lid": str(uuid4()),
+            "answer": answer,
+            "is_correct": is_correct,
+            "status": status.value,
+            "awarded": awarded_coins,
+            "correct": 1 if is_correct else 0,
+            "reason": reason,
+            "now": datetime.utcnow(),
+        },
+    ).one()
+    return SubmissionResult(fresh=bool(row.fresh), allowed=bool(row.allowed), submission_id=row.submission_id)
+
+
+# Las monedas previas se leen (y bloquean) antes del UPDATE para devolver
+# el delta exacto por entrega; regradear nunca duplica ni pierde monedas.
+# Aprobar cuenta como correcta y rechazar como incorrecta; "submitted" conserva
+# is_correct. La diferencia se lleva a correct_count de los grupos objetivo en
+# la misma sentencia, igual que hace rebuild_group_stats al contar is_correct.
+_APPLY_GRADES = text(
+    """
+    WITH input AS (
+        SELECT *
+        FROM unnest(
+            CAST(:ids AS uuid[]),
+            CAST(:statuses AS submissionstatus[]),
+            CAST(:scores AS integer[]),
+            CAST(:coins AS integer[])
+        ) AS i(id, status, score, coins)
+    ),
+    old AS (
+        SELECT s.id, coalesce(s.awarded_coins, 0) AS coins, coalesce(s.is_correct, false) AS correct
+        FROM submissions s
+        JOIN input i ON i.id = s.id
+        WHERE s.activity_id = :aid
+        FOR UPDATE OF s
+    ),
+    graded AS (
+        UPDATE submissions s
+        SET status = i.status,
+            score = i.score,
+            awarded_coins = i.coins,
+            is_correct = CASE i.status
+                WHEN 'approved' THEN true
+                WHEN 'rejected' THEN false
+                ELSE s.is_correct
+            END,
+            graded_by = :grader,
+            updated_at = :now
+        FROM input i
+        JOIN old o ON o.id = i.id
+        WHERE s.id = i.id
+        RETURNING s.id, s.user_id, i.coins - o.coins AS delta,
+                  CAST(coalesce(s.is_correct, false) AS integer) - CAST(o.correct AS integer) AS correct_delta
+    ),
+    stats AS (
+        UPDATE group_activity_stats AS g
+        SET correct_count = g.correct_count + d.total, updated_at = :now
+        FROM (SELECT coalesce(sum(correct_delta), 0) AS total FROM graded) d
+        WHERE d.total <> 0
+          AND g.group_id IN (SELECT group_id FROM activity_targets WHERE activity_id = :aid)
+    )
+    SELECT id, user_id, delta FROM graded
+    """
+)
+
+
+@dataclass(frozen=True)
+class GradeResult:
+    submission_id: UUID
+    user_id: UUID
+    delta: int
+
+
+def apply_grades(
+    db: Session,
+    activity_id: UUID | str,
+    grader_id: UUID | str,
+    grades: Sequence[tuple[UUID, SubmissionStatus, int | None, int]],
+) -> list[GradeResult]:
+    """Applies (submission_id, status, score, coins) tuples in one UPDATE. The caller commits.
+
+    The same statement adjusts ``correct_count`` in the group rollups.
+
+    Submissions that do not belong to ``activity_id`` are left out of the result.
+    """
+    if not grades:
+        return []
+    rows = db.execute(
+        _APPLY_GRADES,
+        {
+            "aid": str(activity_id),
+            "grader": str(grader_id),
+            "ids": [str(sid) for sid, _, _, _ in grades],
+            "statuses": [status.value for _, status, _, _ in grades],
+            "scores": [score for _, _, score, _ in grades],
+            "coins": [coins for _, _, _, coins in grades],
+            "now": datetime.utcnow(),
+        },
+    ).all()
+    return [GradeResult(submission_id=row.id, user_id=row.user_id, delta=row.delta) for row in rows]
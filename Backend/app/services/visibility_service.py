@@ -0,0 +1,77 @@
+"""Per-student fan-out of published activities (``activity_visibility``).
+
+One row per (student, activity) reachable through a targeted group, with
+the activity window copied so ``/activities/visible`` is a single indexed
+lookup. Rows are written when an activity is published and when a student
+joins a group, and removed when a group is deleted. Callers commit.
+"""
+from __future__ import annotations
+
+from typing import Iterable
+from uuid import UUID
+
+from sqlalchemy import bindparam, text
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID
+from sqlalchemy.orm import Session
+
+_UPSERT = """
+    INSERT INTO activity_visibility (user_id, activity_id, start_at, end_at, created_at)
+    SELECT DISTINCT gm.user_id, a.id, a.start_at, a.end_at, a.created_at
+    FROM activities a
+    JOIN activity_targets t ON t.activity_id = a.id
+    JOIN group_membership gm ON gm.group_id = t.group_id
+    WHERE a.status = 'published' {where}
+    ON CONFLICT (user_id, activity_id) DO UPDATE
+    SET start_at = excluded.start_at, end_at = excluded.end_at
+"""
+
+_FAN_OUT_ACTIVITY = text(_UPSERT.format(where="AND a.id = :aid"))
+_GRANT_GROUP = text(_UPSERT.format(where="AND t.group_id = :gid"))
+_GRANT_GROUP_USERS = text(_UPSERT.format(where="AND t.group_id = :gid AND gm.user_id IN :uids")).bindparams(
+    bindparam("uids", expanding=True, type_=PG_UUID(as_uuid=True))
+)
+
+# Se conservan las filas alcanzables a través de otro grupo del estudiante.
+_REVOKE_GROUP = text(
+    """
+    DELETE FROM activity_visibility v
+    USING activity_targets t, group_membership gm
+    WHERE t.group_id = :gid AND gm.group_id = :gid
+      AND v.activity_id = t.activity_id AND v.user_id = gm.user_id
+      AND NOT EXISTS (
+          SELECT 1
+          FROM activity_targets t2
+          JOIN group_membership gm2 ON gm2.group_id = t2.group_id
+          WHERE t2.activity_id = v.activity_id AND gm2.user_id = v.user_id AND t2.group_id <> :gid
+      )
+    """
+)
+
+
+def fan_out_activity(db: Session, activity_id: UUID | str) -> int:
+    result = db.execute(_FAN_OUT_ACTIVITY, {"aid": str(activity_id)})
+    return result.rowcount or 0
+
+
+def grant_group_activities(db: Session, group_id: UUID | str, user_ids: Iterable[UUID | str] | None = None) -> int:
+    """Makes the group's published activities visible to ``user_ids`` (default: every member)."""
+    if user_ids is None:
+        result = db.execute(_GRANT_GROUP, {"gid": str(group_id)})
+    else:
+        user_ids = [UUID(str(uid)) for uid in user_ids]
+        if not user_ids:
+            return 0
+        result = db.execute(_GRANT_GROUP_USERS, {"gid": str(group_id), "uids": user_ids})
+    return result.rowcount or 0
+
+
+def revoke_group(db: Session, group_id: UUID | str) -> None:
+    """Must run before the group's memberships and targets are deleted."""
+    db.execute(_REVOKE_GROUP, {"gid": str(group_id)})
+
+
+def rebuild_visibility(db: Session) -> int:
+    db.execute(text("LOCK TABLE activity_visibility IN SHARE ROW EXCLUSIVE MODE"))
+    db.execute(text("DELETE FROM activity_visibility"))
+    result = db.execute(text(_UPSERT.format(where="")))
+    return result.rowcount or 0
@@ -0,0 +1,20 @@
+import sys
+import time
+
+from app.db.session import SessionLocal
+from app.services.news_service import publish_due_articles
+
+# Uso: python publish_scheduled_news.py [intervalo_en_segundos]
+# Sin argumento publica una vez (cron); con intervalo queda en bucle.
+interval = float(sys.argv[1]) if len(sys.argv) > 1 else None
+
+while True:
+    db = SessionLocal()
+    try:
+        published = publish_due_articles(db)
+        print(f"{len(published)} scheduled articles published")
+    finally:
+        db.close()
+    if interval is None:
+        break
+    time.sleep(interval)
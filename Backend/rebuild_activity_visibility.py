@@ -0,0 +1,10 @@
+from app.db.session import SessionLocal
+from app.services.visibility_service import rebuild_visibility
+
+db = SessionLocal()
+try:
+    count = rebuild_visibility(db)
+    db.commit()
+    print(f"{count} visible activity rows rebuilt")
+finally:
+    db.close()
@@ -0,0 +1,10 @@
+from app.db.session import SessionLocal
+from app.services.coins_service import rebuild_balances
+
+db = SessionLocal()
+try:
+    count = rebuild_balances(db)
+    db.commit()
+    print(f"{count} balances rebuilt")
+finally:
+    db.close()
@@ -0,0 +1,10 @@
+from app.db.session import SessionLocal
+from app.services.analytics_service import rebuild_group_stats
+
+db = SessionLocal()
+try:
+    count = rebuild_group_stats(db)
+    db.commit()
+    print(f"{count} group stats rebuilt")
+finally:
+    db.close()
@@ -0,0 +1,92 @@
+from uuid import UUID
+
+from sqlalchemy import select
+
+from app.models import CoinsBalance
+from app.models.analytics import GroupActivityStats
+from app.services.analytics_service import COUNTERS, rebuild_group_stats
+from app.services.grading import spec_cache
+
+
+def _rollup(db) -> dict:
+    rows = db.execute(select(GroupActivityStats)).scalars().all()
+    return {row.group_id: tuple(getattr(row, name) for name in COUNTERS) for row in rows}
+
+
+def _balance(db, user_id) -> int:
+    return db.scalar(select(CoinsBalance.balance).where(CoinsBalance.user_id == user_id)) or 0
+
+
+def _course(client, make_user, students: int = 2):
+    _, prof_headers = make_user("professor")
+    group = client.post("/groups/", json={"name": "Física II"}, headers=prof_headers).json()
+    enrolled = [make_user("student") for _ in range(students)]
+    response = client.post(
+        f"/groups/{group['id']}/members/bulk",
+        json={"emails": [user.email for user, _ in enrolled]},
+        headers=prof_headers,
+    )
+    assert response.json()["enrolled"] == students
+    activity = client.post(
+        "/activities/",
+        json={
+            "title": "Quiz 1",
+            "q_text": "¿2 + 2?",
+            "q_options": ["3", "4"],
+            "q_correct": [1],
+            "coins_on_complete": 5,
+            "target_group_ids": [group["id"]],
+        },
+        headers=prof_headers,
+    ).json()
+    assert client.post(f"/activities/{activity['id']}/publish", headers=prof_headers).status_code == 200
+    return UUID(group["id"]), activity["id"], prof_headers, enrolled
+
+
+def test_submit_grade_and_rollups_stay_consistent(client, db, make_user):
+    group_id, activity_id, prof_headers, [(alice, alice_h), (bob, bob_h)] = _course(client, make_user)
+    _, outsider_h = make_user("student")
+    url = f"/activities/{activity_id}/submissions"
+
+    right = client.post(url, json={"selected": [1]}, headers=alice_h).json()
+    assert (right["status"], right["is_correct"], right["awarded_coins"]) == ("approved", True, 5)
+    wrong = client.post(url, json={"selected": [1, 1]}, headers=bob_h).json()
+    assert (wrong["status"], wrong["is_correct"], wrong["awarded_coins"]) == ("submitted", False, 0)
+    assert client.post(url, json={"selected": [1]}, headers=alice_h).status_code == 400
+    assert client.post(url, json={"selected": [1]}, headers=outsider_h).status_code == 403
+    assert (_balance(db, alice.id), _balance(db, bob.id)) == (5, 0)
+
+    summary = client.get("/analytics/my", headers=prof_headers).json()["groups"][0]
+    assert (summary["total_submissions"], summary["responded_students"], summary["accuracy"]) == (2, 2, 50.0)
+
+    # Calificar a mano: aprobar cuenta como correcta y mueve las monedas.
+    grades = {"grades": [
+        {"submission_id": right["submission_id"], "status": "approved", "coins": 5},
+        {"submission_id": wrong["submission_id"], "status": "approved", "coins": 3},
+    ]}
+    graded = client.post(f"/activities/{activity_id}/grades", json=grades, headers=prof_headers).json()
+    assert (graded["updated"], graded["coins_delta"]) == (2, 3)
+    assert (_balance(db, alice.id), _balance(db, bob.id)) == (5, 3)
+    summary = client.get("/analytics/my", headers=prof_headers).json()["groups"][0]
+    assert summary["accuracy"] == 100.0
+
+    incremental = _rollup(db)
+    rebuild_group_stats(db)
+    db.commit()
+    assert _rollup(db) == incremental
+    assert incremental[group_id][COUNTERS.index("correct_count")] == 2
+
+
+def test_submit_reloads_a_stale_spec(client, db, make_user):
+    _, activity_id, prof_headers, [(_, first_h), (_, second_h)] = _course(client, make_user)
+    url = f"/activities/{activity_id}/submissions"
+    assert client.post(url, json={"selected": [1]}, headers=first_h).status_code == 200
+    stale = spec_cache.get(UUID(activity_id))
+    assert stale is not None
+
+    # Republicar sube la versión; otro worker seguiría con la especificación vieja.
+    client.post(f"/activities/{activity_id}/publish", headers=prof_headers)
+    spec_cache.set(UUID(activity_id), stale)
+    response = client.post(url, json={"selected": [1]}, headers=second_h)
+    assert response.status_code == 200
+    assert response.json()["awarded_coins"] == 5
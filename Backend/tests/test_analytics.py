@@ -0,0 +1,31 @@
+from app.models import Group, GroupMembership
+from app.services.analytics_service import bump_group_stats
+
+
+def _add_groups(db, owner_id, count: int) -> None:
+    groups = [Group(name=f"Grupo {index}", created_by=owner_id) for index in range(count)]
+    db.add_all(groups)
+    db.flush()
+    db.add_all(GroupMembership(group_id=g.id, user_id=owner_id, role_in_group="owner") for g in groups)
+    bump_group_stats(db, [g.id for g in groups], member_count=1, activity_count=2, submission_count=3)
+    db.commit()
+
+
+def _queries(client, headers) -> tuple[int, int]:
+    response = client.get("/analytics/my", headers=headers)
+    assert response.status_code == 200
+    return int(response.headers["X-DB-Queries"]), response.json()["total_groups"]
+
+
+def test_my_stats_query_count_is_flat_in_the_number_of_groups(client, db, make_user):
+    professor, headers = make_user("professor")
+
+    _add_groups(db, professor.id, 1)
+    one_group, total = _queries(client, headers)
+    assert total == 1
+
+    _add_groups(db, professor.id, 39)
+    forty_groups, total = _queries(client, headers)
+    assert total == 40
+
+    assert forty_groups == one_group
@@ -0,0 +1,73 @@
+"""Requests/sec of the same balance read on the sync and the asyncpg path.
+
+Run with ``pytest -s tests/test_async_benchmark.py`` to see the figures.
+Both routes run the query from ``/coins/me`` under identical concurrency;
+the sync one goes through FastAPI's threadpool and psycopg2, the async one
+stays on the event loop with asyncpg.
+"""
+import time
+from uuid import UUID
+
+import anyio
+import httpx
+from fastapi import Depends, FastAPI
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.deps import get_async_db, get_db
+from app.db.session import async_engine
+from app.services.coins_service import get_balance, get_balance_async, record_coins
+
+REQUESTS = 400
+CONCURRENCY = 50
+
+
+def _bench_app(user_id: UUID) -> FastAPI:
+    bench = FastAPI()
+
+    @bench.get("/sync")
+    def sync_balance(db: Session = Depends(get_db)):
+        return {"balance": get_balance(db, user_id)[0]}
+
+    @bench.get("/async")
+    async def async_balance(db: AsyncSession = Depends(get_async_db)):
+        return {"balance": (await get_balance_async(db, user_id))[0]}
+
+    return bench
+
+
+async def _load(client: httpx.AsyncClient, path: str) -> tuple[float, set]:
+    statuses = set()
+    remaining = iter(range(REQUESTS))
+
+    async def worker():
+        for _ in remaining:
+            response = await client.get(path)
+            statuses.add((response.status_code, response.json()["balance"]))
+
+    started = time.perf_counter()
+    async with anyio.create_task_group() as tg:
+        for _ in range(CONCURRENCY):
+            tg.start_soon(worker)
+    return REQUESTS / (time.perf_counter() - started), statuses
+
+
+def test_benchmark_sync_vs_async_balance_reads(db, make_user):
+    user, _ = make_user("student")
+    record_coins(db, user_id=user.id, delta=7, reason="test")
+    db.commit()
+    transport = httpx.ASGITransport(app=_bench_app(user.id))
+
+    async def run():
+        results = {}
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            for path in ("/sync", "/async", "/sync", "/async"):  # la primera pasada calienta los pools
+                results[path] = await _load(client, path)
+        await async_engine.dispose()
+        return results
+
+    results = anyio.run(run)
+    for path, (rps, _) in results.items():
+        print(f"\n{path:>6}: {rps:8.0f} req/s ({REQUESTS} requests, concurrency {CONCURRENCY})")
+    for _, statuses in results.values():
+        assert statuses == {(200, 7)}
@@ -0,0 +1,99 @@
+import time
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+from fastapi.security import HTTPAuthorizationCredentials
+
+from app.core import deps
+from app.core.security import create_access_token
+
+
+@pytest.fixture
+def decode_calls(monkeypatch):
+    calls = []
+    real_decode = deps.jwt.decode
+
+    def counting_decode(*args, **kwargs):
+        calls.append(args[0])
+        return real_decode(*args, **kwargs)
+
+    monkeypatch.setattr(deps.jwt, "decode", counting_decode)
+    deps.token_cache.clear()
+    yield calls
+    deps.token_cache.clear()
+
+
+def _creds(token: str) -> HTTPAuthorizationCredentials:
+    return HTTPAuthorizationCredentials(scheme="Bearer", credentials=token)
+
+
+def test_verified_claims_are_cached_until_exp(decode_calls, monkeypatch):
+    token = create_access_token("3f0c5a52-8a0e-4b8e-9a56-1c1d0d6d1a01", "student")
+
+    first = deps.current_user(_creds(token))
+    second = deps.current_user(_creds(token))
+    assert first == second
+    assert first["role"] == "student"
+    assert len(decode_calls) == 1
+
+    # Pasado el exp del token la entrada caduca y se vuelve a verificar.
+    later = time.time() + 24 * 60 * 60
+    monkeypatch.setattr("app.core.cache.time", SimpleNamespace(time=lambda: later))
+    deps.current_user(_creds(token))
+    assert len(decode_calls) == 2
+
+
+def test_callers_cannot_mutate_cached_claims(decode_calls):
+    token = create_access_token("3f0c5a52-8a0e-4b8e-9a56-1c1d0d6d1a01", "student")
+    deps.current_user(_creds(token))["role"] = "superuser"
+    assert deps.current_user(_creds(token))["role"] == "student"
+
+
+def test_invalid_tokens_are_not_cached(decode_calls):
+    for _ in range(2):
+        with pytest.raises(HTTPException) as exc:
+            deps.current_user(_creds("not-a-jwt"))
+        assert exc.value.status_code == 401
+    assert len(decode_calls) == 2
+    assert len(deps.token_cache) == 0
+
+
+def test_cached_token_authenticates_requests(client, make_user, decode_calls):
+    _, headers = make_user("student")
+    for _ in range(3):
+        assert client.get("/coins/me", headers=headers).status_code == 200
+    assert len(decode_calls) == 1
+
+
+def _time_per_call(fn, rounds: int) -> float:
+    started = time.perf_counter()
+    for _ in range(rounds):
+        fn()
+    return (time.perf_counter() - started) / rounds
+
+
+def test_benchmark_auth_overhead_with_and_without_cache(monkeypatch):
+    """Per-request auth cost with the token cache on and bypassed (``pytest -s`` prints it)."""
+    from fastapi.testclient import TestClient
+
+    from app.core.cache import LRUCache
+    from app.main import app
+
+    token = create_access_token("3f0c5a52-8a0e-4b8e-9a56-1c1d0d6d1a01", "superuser")
+    headers = {"Authorization": f"Bearer {token}"}
+    http = TestClient(app)
+    rounds = 300
+    results = {}
+    # /chat/cache/stats solo autentica: no toca la base de datos.
+    for label, cache in (("cached", LRUCache(4096)), ("bypassed", LRUCache(0))):
+        monkeypatch.setattr(deps, "token_cache", cache)
+        deps.current_user(_creds(token))
+        results[label] = (
+            _time_per_call(lambda: deps.current_user(_creds(token)), rounds * 10),
+            _time_per_call(lambda: http.get("/chat/cache/stats", headers=headers), rounds),
+        )
+
+    for label, (auth, request) in results.items():
+        print(f"\n{label:>9}: current_user {auth * 1e6:8.1f} us   request {request * 1e3:6.2f} ms")
+    assert results["cached"][0] * 2 < results["bypassed"][0]
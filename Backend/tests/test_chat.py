@@ -0,0 +1,189 @@
+import json
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from uuid import UUID
+
+import anyio
+from sqlalchemy import func, select
+
+from app.core.config import settings
+from app.models import ChatMessage, CoinsBalance, CoinsLedger
+from app.services.coins_service import record_coins
+
+
+def _start_chat(client, db, make_user, coins):
+    user, headers = make_user("student")
+    record_coins(db, user_id=user.id, delta=coins, reason="test")
+    db.commit()
+    response = client.post("/chat/sessions", json={"title": "t"}, headers=headers)
+    assert response.status_code == 201
+    return user, headers, UUID(response.json()["id"])
+
+
+def test_concurrent_messages_cannot_overspend(client, db, make_user, monkeypatch):
+    # Modelo lento: ambos envíos están dentro de la llamada al mismo tiempo.
+    monkeypatch.setattr(settings, "FAKE_LLM_FIRST_TOKEN_MS", 500)
+    user, headers, session_id = _start_chat(client, db, make_user, coins=2)
+
+    def send(text):
+        return client.post(f"/chat/sessions/{session_id}/messages", json={"content": text}, headers=headers)
+
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        responses = list(pool.map(send, ["hola", "adiós"]))
+
+    assert sorted(r.status_code for r in responses) == [200, 400]
+    balance = db.scalar(select(CoinsBalance.balance).where(CoinsBalance.user_id == user.id))
+    ledger = db.scalar(select(func.sum(CoinsLedger.delta)).where(CoinsLedger.user_id == user.id))
+    assert balance == ledger == 0
+    roles = db.scalars(select(ChatMessage.role).where(ChatMessage.session_id == session_id)).all()
+    assert sorted(roles) == ["assistant", "user"]
+
+
+def test_model_failure_refunds_and_drops_message(client, db, make_user, monkeypatch):
+    user, headers, session_id = _start_chat(client, db, make_user, coins=2)
+
+    def broken(_messages):
+        raise RuntimeError("down")
+
+    monkeypatch.setattr("app.routers.chat.generate_ai_reply", broken)
+    response = client.post(f"/chat/sessions/{session_id}/messages", json={"content": "hola"}, headers=headers)
+
+    assert response.status_code == 502
+    assert db.scalar(select(CoinsBalance.balance).where(CoinsBalance.user_id == user.id)) == 2
+    assert db.scalar(select(func.count()).where(ChatMessage.session_id == session_id)) == 0
+
+
+def test_other_endpoints_respond_while_the_model_runs(client, db, make_user, monkeypatch):
+    # Modelo lento; mientras responde, la petición no debe retener una conexión del pool.
+    monkeypatch.setattr(settings, "FAKE_LLM_FIRST_TOKEN_MS", 2000)
+    _, headers, session_id = _start_chat(client, db, make_user, coins=2)
+
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        started = time.perf_counter()
+        pending = pool.submit(
+            client.post, f"/chat/sessions/{session_id}/messages", json={"content": "hola"}, headers=headers
+        )
+        time.sleep(0.3)
+        for path in ("/health", "/coins/me"):
+            before = time.perf_counter()
+            assert client.get(path, headers=headers).status_code == 200
+            assert time.perf_counter() - before < 0.5
+        assert not pending.done()
+        assert pending.result().status_code == 200
+        assert time.perf_counter() - started >= 2.0
+
+
+_SSE_EVENT = re.compile(r"event: (\w+)\ndata: (.*)\n\n")
+
+
+def _stream(path, payload, headers):
+    """Drives the ASGI app directly so each body chunk is timestamped as it is sent.
+
+    TestClient buffers the whole response, which would hide whether tokens
+    arrive before the reply is complete.
+    """
+    from app.main import app
+
+    chunks: list[tuple[float, bytes]] = []
+    response: dict = {}
+    body = json.dumps(payload).encode()
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "POST",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "root_path": "",
+        "query_string": b"",
+        "headers": [(b"content-type", b"application/json")]
+        + [(name.lower().encode(), value.encode()) for name, value in headers.items()],
+        "client": ("testclient", 50000),
+        "server": ("testserver", 80),
+    }
+    sent = False
+
+    async def receive():
+        nonlocal sent
+        if not sent:
+            sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        await anyio.sleep_forever()
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            response["status"] = message["status"]
+            response["headers"] = {k.decode(): v.decode() for k, v in message["headers"]}
+        elif message["type"] == "http.response.body" and message.get("body"):
+            chunks.append((time.perf_counter(), message["body"]))
+
+    anyio.run(app, scope, receive, send)
+    return response, chunks
+
+
+def _events(chunks):
+    text = b"".join(chunk for _, chunk in chunks).decode()
+    events = [(name, json.loads(data)) for name, data in _SSE_EVENT.findall(text)]
+    # Todo el cuerpo debe ser eventos bien formados, sin restos.
+    assert _SSE_EVENT.sub("", text) == ""
+    return events
+
+
+def test_stream_sends_tokens_before_the_reply_is_complete(client, db, make_user, monkeypatch):
+    monkeypatch.setattr(settings, "FAKE_LLM_FIRST_TOKEN_MS", 50)
+    monkeypatch.setattr(settings, "FAKE_LLM_TOKEN_DELAY_MS", 60)
+    user, headers, session_id = _start_chat(client, db, make_user, coins=2)
+
+    response, chunks = _stream(f"/chat/sessions/{session_id}/messages/stream", {"content": "hola"}, headers)
+
+    assert response["status"] == 200
+    assert response["headers"]["content-type"].startswith("text/event-stream")
+    events = _events(chunks)
+    names = [name for name, _ in events]
+    assert names[-1] == "done" and set(names[:-1]) == {"token"} and len(names) > 2
+    tokens = "".join(data["content"] for name, data in events if name == "token")
+    assert tokens == events[-1][1]["content"]
+    # El primer token sale mientras el modelo sigue escribiendo.
+    first_token_at, done_at = chunks[0][0], chunks[-1][0]
+    assert done_at - first_token_at >= 0.2
+
+    roles = db.scalars(select(ChatMessage.role).where(ChatMessage.session_id == session_id)).all()
+    assert sorted(roles) == ["assistant", "user"]
+    assert db.scalar(select(CoinsBalance.balance).where(CoinsBalance.user_id == user.id)) == 0
+
+
+def test_stream_failure_sends_error_and_refunds(client, db, make_user, monkeypatch):
+    user, headers, session_id = _start_chat(client, db, make_user, coins=2)
+
+    async def broken(_messages):
+        yield "Respuesta "
+        raise RuntimeError("down")
+
+    monkeypatch.setattr("app.routers.chat.stream_ai_reply", broken)
+    response, chunks = _stream(f"/chat/sessions/{session_id}/messages/stream", {"content": "hola"}, headers)
+
+    assert response["status"] == 200
+    assert [name for name, _ in _events(chunks)] == ["token", "error"]
+    db.expire_all()
+    assert db.scalar(select(CoinsBalance.balance).where(CoinsBalance.user_id == user.id)) == 2
+    assert db.scalar(select(func.count()).where(ChatMessage.session_id == session_id)) == 0
+
+
+def test_concurrent_streams_reserve_coins_up_front(client, db, make_user, monkeypatch):
+    monkeypatch.setattr(settings, "FAKE_LLM_FIRST_TOKEN_MS", 500)
+    user, headers, session_id = _start_chat(client, db, make_user, coins=2)
+
+    def send(text):
+        return client.post(f"/chat/sessions/{session_id}/messages/stream", json={"content": text}, headers=headers)
+
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        responses = list(pool.map(send, ["hola", "adiós"]))
+
+    # El segundo se rechaza antes de llamar al modelo, no con un error a mitad del stream.
+    assert sorted(r.status_code for r in responses) == [200, 400]
+    ok = next(r for r in responses if r.status_code == 200)
+    assert "event: done" in ok.text
+    assert db.scalar(select(CoinsBalance.balance).where(CoinsBalance.user_id == user.id)) == 0
+    assert db.scalar(select(func.count()).where(ChatMessage.session_id == session_id)) == 2
@@ -0,0 +1,42 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from sqlalchemy import func, select
+
+from app.models import CoinsBalance, CoinsLedger
+from app.services.coins_service import rebuild_balances
+
+
+def _ledger_sum(db, user_id) -> int:
+    return db.scalar(select(func.coalesce(func.sum(CoinsLedger.delta), 0)).where(CoinsLedger.user_id == user_id))
+
+
+def test_concurrent_adjustments_keep_balance_equal_to_ledger(client, db, make_user):
+    student, student_headers = make_user("student")
+    _, admin_headers = make_user("superuser")
+
+    def adjust(delta):
+        body = {"user_id": str(student.id), "delta": delta, "reason": "ajuste"}
+        return client.post("/coins/adjust", json=body, headers=admin_headers).status_code
+
+    deltas = [5] * 20 + [-3] * 10
+    with ThreadPoolExecutor(max_workers=10) as pool:
+        assert set(pool.map(adjust, deltas)) == {201}
+
+    # /coins/me lee por el motor asyncpg; debe ver lo que escribió el síncrono.
+    balance = client.get("/coins/me", headers=student_headers).json()["balance"]
+    assert balance == _ledger_sum(db, student.id) == sum(deltas)
+
+
+def test_rebuild_matches_incremental_balances(client, db, make_user):
+    users = [make_user("student")[0] for _ in range(3)]
+    _, admin_headers = make_user("superuser")
+    for index, user in enumerate(users):
+        for delta in (10, -(index + 1)):
+            body = {"user_id": str(user.id), "delta": delta, "reason": "ajuste"}
+            assert client.post("/coins/adjust", json=body, headers=admin_headers).status_code == 201
+
+    before = dict(db.execute(select(CoinsBalance.user_id, CoinsBalance.balance)).all())
+    rebuild_balances(db)
+    db.commit()
+    after = dict(db.execute(select(CoinsBalance.user_id, CoinsBalance.balance)).all())
+    assert before == after == {user.id: _ledger_sum(db, user.id) for user in users}
@@ -0,0 +1,71 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from uuid import UUID
+
+from sqlalchemy import func, select
+
+from app.models import GroupMembership, InviteCode
+from app.models.analytics import GroupActivityStats
+
+
+def _group_with_invite(client, make_user, **invite):
+    _, prof_headers = make_user("professor")
+    group = client.post("/groups/", json={"name": "Cálculo I"}, headers=prof_headers).json()
+    response = client.post(f"/groups/{group['id']}/invites", json=invite, headers=prof_headers)
+    return UUID(group["id"]), response.json()["code"], prof_headers
+
+
+def test_concurrent_joins_never_exceed_max_uses(client, db, make_user):
+    group_id, code, _ = _group_with_invite(client, make_user, max_uses=3)
+    students = [make_user("student")[1] for _ in range(10)]
+
+    def join(headers):
+        return client.post("/groups/join", json={"code": code}, headers=headers)
+
+    with ThreadPoolExecutor(max_workers=len(students)) as pool:
+        responses = list(pool.map(join, students))
+
+    joined = [r for r in responses if r.status_code == 200 and r.json()["status"] == "joined"]
+    exhausted = [r for r in responses if r.status_code == 400 and r.json()["detail"] == "max uses reached"]
+    assert (len(joined), len(exhausted)) == (3, 7)
+    assert db.scalar(select(InviteCode.uses).where(InviteCode.code == code)) == 3
+    members = db.scalar(select(func.count()).where(GroupMembership.group_id == group_id))
+    assert members == 4  # dueño + 3 estudiantes
+    stats = db.scalar(select(GroupActivityStats.member_count).where(GroupActivityStats.group_id == group_id))
+    assert stats == members
+
+
+def test_join_reports_each_outcome(client, db, make_user):
+    _, code, _ = _group_with_invite(client, make_user, max_uses=5)
+    _, headers = make_user("student")
+
+    first = client.post("/groups/join", json={"code": code}, headers=headers)
+    again = client.post("/groups/join", json={"code": code}, headers=headers)
+    assert first.json()["status"] == "joined"
+    assert again.json()["status"] == "already_member"
+    assert db.scalar(select(InviteCode.uses).where(InviteCode.code == code)) == 1
+
+    _, expired_code, _ = _group_with_invite(
+        client, make_user, expires_at=(datetime.utcnow() - timedelta(hours=1)).isoformat()
+    )
+    response = client.post("/groups/join", json={"code": expired_code}, headers=headers)
+    assert (response.status_code, response.json()["detail"]) == (400, "expired code")
+    response = client.post("/groups/join", json={"code": "nope"}, headers=headers)
+    assert (response.status_code, response.json()["detail"]) == (400, "invalid code")
+
+
+def test_bulk_enroll_respects_invite_capacity(client, db, make_user):
+    group_id, code, prof_headers = _group_with_invite(client, make_user, max_uses=2)
+    emails = [make_user("student")[0].email for _ in range(3)]
+
+    response = client.post(
+        f"/groups/{group_id}/members/bulk",
+        json={"emails": emails, "invite_code": code},
+        headers=prof_headers,
+    )
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["enrolled"] == 2
+    assert [row["status"] for row in body["rows"]] == ["enrolled", "enrolled", "invite_full"]
+    assert db.scalar(select(InviteCode.uses).where(InviteCode.code == code)) == 2
@@ -0,0 +1,28 @@
+from datetime import datetime, timedelta
+
+from app.services import news_feed
+from app.services.news_service import publish_due_articles
+
+
+def test_scheduled_publish_reaches_workers_that_cached_the_feed(client, db, make_user, monkeypatch):
+    _, editor_headers = make_user("communications")
+    _, reader_headers = make_user("student")
+    article = {
+        "title": "Semana de la ciencia",
+        "body": "Programación completa.",
+        "category": "eventos",
+        "publish_at": (datetime.utcnow() - timedelta(minutes=1)).isoformat(),
+    }
+    assert client.post("/news/", json=article, headers=editor_headers).status_code == 201
+
+    before = client.get("/news/", headers=reader_headers)
+    assert before.json() == []
+    assert len(news_feed.feed_cache) == 1
+
+    # El CLI corre en otro proceso: solo puede avisar a través de la base de datos.
+    monkeypatch.setattr(news_feed.feed_cache, "clear", lambda: None)
+    assert len(publish_due_articles(db)) == 1
+
+    after = client.get("/news/", headers={**reader_headers, "If-None-Match": before.headers["ETag"]})
+    assert after.status_code == 200
+    assert [item["title"] for item in after.json()] == ["Semana de la ciencia"]
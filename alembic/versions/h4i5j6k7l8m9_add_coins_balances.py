@@ -0,0 +1,41 @@
+"""add materialized coins balances
+
+Revision ID: h4i5j6k7l8m9
+Revises: g3h4i5j6k7l8, bb56d8a3c92e
+Create Date: 2025-12-02 10:00:00.000000
+"""
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = "h4i5j6k7l8m9"
+down_revision = ("g3h4i5j6k7l8", "bb56d8a3c92e")
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index("ix_coins_ledger_user_id", "coins_ledger", ["user_id"])
+
+    op.create_table(
+        "coins_balances",
+        sa.Column("user_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("users.id"), primary_key=True),
+        sa.Column("balance", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("updated_at", sa.DateTime(), nullable=False, server_default=sa.func.now()),
+    )
+
+    op.execute(
+        """
+        INSERT INTO coins_balances (user_id, balance, updated_at)
+        SELECT user_id, COALESCE(SUM(delta), 0), COALESCE(MAX(created_at), now())
+        FROM coins_ledger
+        GROUP BY user_id
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("coins_balances")
+    op.drop_index("ix_coins_ledger_user_id", table_name="coins_ledger")
@@ -0,0 +1,61 @@
+"""add group activity stats rollup
+
+Revision ID: i5j6k7l8m9n0
+Revises: h4i5j6k7l8m9
+Create Date: 2025-12-02 15:30:00.000000
+"""
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = "i5j6k7l8m9n0"
+down_revision = "h4i5j6k7l8m9"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index("ix_groups_created_by", "groups", ["created_by"])
+
+    op.create_table(
+        "group_activity_stats",
+        sa.Column(
+            "group_id",
+            postgresql.UUID(as_uuid=True),
+            sa.ForeignKey("groups.id", ondelete="CASCADE"),
+            primary_key=True,
+        ),
+        sa.Column("member_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("activity_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("submission_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("correct_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("responded_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("updated_at", sa.DateTime(), nullable=False, server_default=sa.func.now()),
+    )
+
+    op.execute(
+        """
+        INSERT INTO group_activity_stats (
+            group_id, member_count, activity_count, submission_count, correct_count, responded_count, updated_at
+        )
+        SELECT
+            g.id,
+            (SELECT count(DISTINCT gm.user_id) FROM group_membership gm WHERE gm.group_id = g.id),
+            (SELECT count(DISTINCT t.activity_id) FROM activity_targets t WHERE t.group_id = g.id),
+            (SELECT count(s.id) FROM submissions s
+                JOIN activity_targets t ON t.activity_id = s.activity_id WHERE t.group_id = g.id),
+            (SELECT count(s.id) FROM submissions s
+                JOIN activity_targets t ON t.activity_id = s.activity_id WHERE t.group_id = g.id AND s.is_correct),
+            (SELECT count(DISTINCT s.user_id) FROM submissions s
+                JOIN activity_targets t ON t.activity_id = s.activity_id WHERE t.group_id = g.id),
+            now()
+        FROM groups g
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("group_activity_stats")
+    op.drop_index("ix_groups_created_by", table_name="groups")
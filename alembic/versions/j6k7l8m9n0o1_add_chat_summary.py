@@ -0,0 +1,27 @@
+"""add rolling chat summary
+
+Revision ID: j6k7l8m9n0o1
+Revises: i5j6k7l8m9n0
+Create Date: 2025-12-03 11:00:00.000000
+"""
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "j6k7l8m9n0o1"
+down_revision = "i5j6k7l8m9n0"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("chat_sessions", sa.Column("summary", sa.Text()))
+    op.add_column("chat_sessions", sa.Column("summarized_until", sa.DateTime()))
+    op.create_index("ix_chat_messages_session_created", "chat_messages", ["session_id", "created_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_chat_messages_session_created", table_name="chat_messages")
+    op.drop_column("chat_sessions", "summarized_until")
+    op.drop_column("chat_sessions", "summary")
@@ -0,0 +1,40 @@
+"""composite indexes for keyset pagination
+
+Revision ID: k7l8m9n0o1p2
+Revises: j6k7l8m9n0o1
+Create Date: 2025-12-04 09:00:00.000000
+"""
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "k7l8m9n0o1p2"
+down_revision = "j6k7l8m9n0o1"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_news_articles_feed",
+        "news_articles",
+        [sa.text("publish_at DESC NULLS LAST"), sa.text("created_at DESC"), sa.text("id DESC")],
+    )
+    op.create_index("ix_questions_created_id", "questions", ["created_at", "id"])
+    op.create_index("ix_question_responses_created_id", "question_responses", ["created_at", "id"])
+    op.create_index("ix_places_created_id", "places", ["created_at", "id"])
+    op.create_index("ix_map_events_start_id", "map_events", ["start_at", "id"])
+    # El índice compuesto cubre también las búsquedas solo por user_id.
+    op.create_index("ix_coins_ledger_user_created_id", "coins_ledger", ["user_id", "created_at", "id"])
+    op.drop_index("ix_coins_ledger_user_id", table_name="coins_ledger")
+
+
+def downgrade() -> None:
+    op.create_index("ix_coins_ledger_user_id", "coins_ledger", ["user_id"])
+    op.drop_index("ix_coins_ledger_user_created_id", table_name="coins_ledger")
+    op.drop_index("ix_map_events_start_id", table_name="map_events")
+    op.drop_index("ix_places_created_id", table_name="places")
+    op.drop_index("ix_question_responses_created_id", table_name="question_responses")
+    op.drop_index("ix_questions_created_id", table_name="questions")
+    op.drop_index("ix_news_articles_feed", table_name="news_articles")
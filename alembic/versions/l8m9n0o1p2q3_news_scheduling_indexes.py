@@ -0,0 +1,41 @@
+"""partial indexes for the published news feed and scheduled publishing
+
+Revision ID: l8m9n0o1p2q3
+Revises: k7l8m9n0o1p2
+Create Date: 2025-12-04 15:00:00.000000
+"""
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "l8m9n0o1p2q3"
+down_revision = "k7l8m9n0o1p2"
+branch_labels = None
+depends_on = None
+
+FEED_COLUMNS = [sa.text("publish_at DESC NULLS LAST"), sa.text("created_at DESC"), sa.text("id DESC")]
+
+
+def upgrade() -> None:
+    # El feed solo lee artículos publicados; el índice parcial es más pequeño
+    # y coincide con el predicado "published IS true" de list_news.
+    op.create_index(
+        "ix_news_articles_published_feed",
+        "news_articles",
+        FEED_COLUMNS,
+        postgresql_where=sa.text("published IS true"),
+    )
+    op.create_index(
+        "ix_news_articles_scheduled",
+        "news_articles",
+        ["publish_at"],
+        postgresql_where=sa.text("published IS NOT true AND publish_at IS NOT NULL"),
+    )
+    op.drop_index("ix_news_articles_feed", table_name="news_articles")
+
+
+def downgrade() -> None:
+    op.create_index("ix_news_articles_feed", "news_articles", FEED_COLUMNS)
+    op.drop_index("ix_news_articles_scheduled", table_name="news_articles")
+    op.drop_index("ix_news_articles_published_feed", table_name="news_articles")
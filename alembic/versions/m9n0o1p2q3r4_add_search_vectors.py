@@ -0,0 +1,50 @@
+"""full-text search columns and trigram index on group names
+
+Revision ID: m9n0o1p2q3r4
+Revises: l8m9n0o1p2q3
+Create Date: 2025-12-05 10:00:00.000000
+"""
+from __future__ import annotations
+
+from alembic import op
+
+revision = "m9n0o1p2q3r4"
+down_revision = "l8m9n0o1p2q3"
+branch_labels = None
+depends_on = None
+
+SEARCH_VECTORS = {
+    "news_articles": (
+        "setweight(to_tsvector('spanish', coalesce(title, '')), 'A') || "
+        "setweight(to_tsvector('spanish', coalesce(subtitle, '')), 'B') || "
+        "setweight(to_tsvector('spanish', coalesce(body, '')), 'C')"
+    ),
+    "questions": (
+        "setweight(to_tsvector('spanish', coalesce(title, '')), 'A') || "
+        "setweight(to_tsvector('spanish', coalesce(body, '')), 'B')"
+    ),
+    "places": (
+        "setweight(to_tsvector('spanish', coalesce(name, '')), 'A') || "
+        "setweight(jsonb_to_tsvector('spanish', coalesce(tags, '[]'::jsonb), '[\"string\"]'), 'B') || "
+        "setweight(to_tsvector('spanish', coalesce(description, '')), 'C')"
+    ),
+}
+
+
+def upgrade() -> None:
+    # Las columnas generadas se rellenan al reescribir la tabla.
+    for table, expression in SEARCH_VECTORS.items():
+        op.execute(
+            f"ALTER TABLE {table} ADD COLUMN search_vector tsvector GENERATED ALWAYS AS ({expression}) STORED"
+        )
+        op.execute(f"CREATE INDEX ix_{table}_search ON {table} USING gin (search_vector)")
+
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.execute("CREATE INDEX ix_groups_name_trgm ON groups USING gin (lower(name) gin_trgm_ops)")
+
+
+def downgrade() -> None:
+    op.drop_index("ix_groups_name_trgm", table_name="groups")
+    for table in reversed(list(SEARCH_VECTORS)):
+        op.drop_index(f"ix_{table}_search", table_name=table)
+        op.drop_column(table, "search_vector")
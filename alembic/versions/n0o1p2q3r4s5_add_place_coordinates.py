@@ -0,0 +1,59 @@
+"""latitude/longitude columns and GiST point indexes for the campus map
+
+Revision ID: n0o1p2q3r4s5
+Revises: m9n0o1p2q3r4
+Create Date: 2025-12-05 16:00:00.000000
+"""
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "n0o1p2q3r4s5"
+down_revision = "m9n0o1p2q3r4"
+branch_labels = None
+depends_on = None
+
+NUMERIC = r"'^\s*-?[0-9]+(\.[0-9]+)?\s*$'"
+
+# Mismas claves que app.services.geo.extract_coordinates.
+LAT = "coalesce(location->>'lat', location->>'latitude', location->'coordinates'->>1)"
+LNG = "coalesce(location->>'lng', location->>'lon', location->>'longitude', location->'coordinates'->>0)"
+
+
+def upgrade() -> None:
+    for table in ("places", "map_events"):
+        op.add_column(table, sa.Column("latitude", sa.Float()))
+        op.add_column(table, sa.Column("longitude", sa.Float()))
+        op.execute(
+            f"""
+            UPDATE {table} t
+            SET latitude = c.lat, longitude = c.lng
+            FROM (
+                SELECT id,
+                       CASE WHEN {LAT} ~ {NUMERIC} THEN ({LAT})::float8 END AS lat,
+                       CASE WHEN {LNG} ~ {NUMERIC} THEN ({LNG})::float8 END AS lng
+                FROM {table}
+                WHERE jsonb_typeof(location) = 'object'
+            ) c
+            WHERE t.id = c.id AND c.lat BETWEEN -90 AND 90 AND c.lng BETWEEN -180 AND 180
+            """
+        )
+        op.execute(f"CREATE INDEX ix_{table}_point ON {table} USING gist (point(longitude, latitude))")
+
+    # Eventos sin coordenadas propias heredan las de su lugar.
+    op.execute(
+        """
+        UPDATE map_events e
+        SET latitude = p.latitude, longitude = p.longitude
+        FROM places p
+        WHERE e.place_id = p.id AND e.latitude IS NULL AND p.latitude IS NOT NULL
+        """
+    )
+
+
+def downgrade() -> None:
+    for table in ("map_events", "places"):
+        op.drop_index(f"ix_{table}_point", table_name=table)
+        op.drop_column(table, "longitude")
+        op.drop_column(table, "latitude")
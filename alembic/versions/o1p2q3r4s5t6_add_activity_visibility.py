@@ -0,0 +1,49 @@
+"""per-student visible activity fan-out
+
+Revision ID: o1p2q3r4s5t6
+Revises: n0o1p2q3r4s5
+Create Date: 2025-12-06 10:00:00.000000
+"""
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = "o1p2q3r4s5t6"
+down_revision = "n0o1p2q3r4s5"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "activity_visibility",
+        sa.Column("user_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("users.id", ondelete="CASCADE"), nullable=False),
+        sa.Column(
+            "activity_id",
+            postgresql.UUID(as_uuid=True),
+            sa.ForeignKey("activities.id", ondelete="CASCADE"),
+            nullable=False,
+        ),
+        sa.Column("start_at", sa.DateTime(timezone=True)),
+        sa.Column("end_at", sa.DateTime(timezone=True)),
+        sa.Column("created_at", sa.DateTime()),
+        sa.PrimaryKeyConstraint("user_id", "activity_id"),
+    )
+    op.create_index("ix_activity_visibility_user_window", "activity_visibility", ["user_id", "start_at", "end_at"])
+    op.execute(
+        """
+        INSERT INTO activity_visibility (user_id, activity_id, start_at, end_at, created_at)
+        SELECT DISTINCT gm.user_id, a.id, a.start_at, a.end_at, a.created_at
+        FROM activities a
+        JOIN activity_targets t ON t.activity_id = a.id
+        JOIN group_membership gm ON gm.group_id = t.group_id
+        WHERE a.status = 'published'
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_activity_visibility_user_window", table_name="activity_visibility")
+    op.drop_table("activity_visibility")
@@ -0,0 +1,32 @@
+"""shared news feed version and guard for stale drafts
+
+Revision ID: q3r4s5t6u7v8
+Revises: p2q3r4s5t6u7
+Create Date: 2025-12-07 09:00:00.000000
+"""
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "q3r4s5t6u7v8"
+down_revision = "p2q3r4s5t6u7"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "cache_versions",
+        sa.Column("name", sa.String(length=64), primary_key=True),
+        sa.Column("version", sa.BigInteger(), nullable=False, server_default="0"),
+        sa.Column("updated_at", sa.DateTime(), nullable=True),
+    )
+    op.execute("INSERT INTO cache_versions (name, version, updated_at) VALUES ('news_feed', 0, now())")
+    # Borradores anteriores al programador con fecha ya vencida: esa fecha nunca
+    # significó "publicar solo", así que se descarta para que no salgan de golpe.
+    op.execute("UPDATE news_articles SET publish_at = NULL WHERE published IS NOT true AND publish_at <= now()")
+
+
+def downgrade() -> None:
+    op.drop_table("cache_versions")